@@ -0,0 +1,48 @@
+"""Client directory search latency.
+
+Fills a scratch database with synthetic clients and times the first page of
+prefix searches, with the FTS5 index and with the LIKE fallback.
+Needs no window, so it runs under plain Python. Run from the repository root:
+
+    python -m benchmarks.bench_client_search [count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_clients
+from services.client_directory import ClientDirectory
+
+QUERIES = ['a', 'jo', 'mar', 'alice sm', '555-01', 'follow', 'zzz']
+
+
+def measure(directory, query, repeat=20):
+    """Return (milliseconds per first-page search, results on the page)."""
+    results = directory.search(query)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        directory.search(query)
+    return (time.perf_counter() - start) * 1000 / repeat, len(results)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = os.path.join(tempfile.mkdtemp(prefix='clients-bench-'), 'clients.db')
+    directory = ClientDirectory(path)
+    start = time.perf_counter()
+    directory.extend(make_clients(count))
+    print(f"Inserted {count} clients in {time.perf_counter() - start:.1f}s (fts5: {directory.full_text})")
+
+    print(f"{'query':<12}{'fts ms':>10}{'like ms':>10}{'results':>10}")
+    for query in QUERIES:
+        directory.full_text = True
+        full_text, results = measure(directory, query)
+        directory.full_text = False
+        like, _ = measure(directory, query)
+        print(f"{query:<12}{full_text:>10.2f}{like:>10.2f}{results:>10}")
+    directory.close()
+
+
+if __name__ == '__main__':
+    main()
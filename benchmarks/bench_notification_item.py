@@ -0,0 +1,92 @@
+"""Compare NotificationItem with CompactNotificationItem.
+
+Reports widget count, construction time, memory and relayout time per item.
+Run from the repository root:
+
+    python -m benchmarks.bench_notification_item [count]
+"""
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from kivy.core.window import Window  # noqa: E402,F401 - creates the GL context for textures
+from kivy.uix.boxlayout import BoxLayout  # noqa: E402
+
+from panels.notifications_panel import NotificationItem  # noqa: E402
+from widgets.notification_item import CompactNotificationItem  # noqa: E402
+
+SAMPLE = [
+        {"time": "9:00 am", "title": "Client Meeting", "duration": "5h"},
+        {"time": "11:00 am", "title": "Team Standup", "duration": "5h"},
+        {"time": "3:00 pm", "title": "Design Conference", "duration": "11h"},
+        {"time": "4:30 pm", "title": "Project Deadline", "duration": "11h"}
+]
+
+
+def count_widgets(widget):
+    """Count `widget` and all of its descendants."""
+    return 1 + sum(count_widgets(child) for child in widget.children)
+
+
+def build(item_class, count):
+    """Build `count` items of `item_class` and return them."""
+    return [item_class(**SAMPLE[index % len(SAMPLE)]) for index in range(count)]
+
+
+def measure(item_class, count):
+    """Return (widgets per item, microseconds per item, bytes per item)."""
+    # Warm up shared caches (fonts, icons, text textures) before measuring
+    build(item_class, len(SAMPLE))
+
+    # Keep garbage from earlier runs out of the timing
+    gc.collect()
+    gc.disable()
+    start = time.perf_counter()
+    items = build(item_class, count)
+    elapsed = time.perf_counter() - start
+    gc.enable()
+    widgets = count_widgets(items[0])
+    del items
+
+    tracemalloc.start()
+    items = build(item_class, count)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+
+    return widgets, elapsed * 1e6 / count, memory / count
+
+
+def measure_relayout(item_class, count, passes=50):
+    """Return microseconds per item to lay out a container that moves and resizes every item."""
+    container = BoxLayout(orientation='vertical', size_hint=(None, None), size=(400, 100 * count))
+    for item in build(item_class, count):
+        container.add_widget(item)
+    container.do_layout()
+
+    gc.collect()
+    start = time.perf_counter()
+    for index in range(passes):
+        # Like scrolling or resizing: every item gets a new pos and size
+        container.width = 400 + index % 2
+        container.y = index % 3
+        container.do_layout()
+    return (time.perf_counter() - start) * 1e6 / passes / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{'class':<26}{'widgets':>10}{'us/item':>12}{'bytes/item':>14}{'relayout us':>14}")
+    for item_class in (NotificationItem, CompactNotificationItem):
+        widgets, micros, memory = measure(item_class, count)
+        relayout = measure_relayout(item_class, count)
+        print(f"{item_class.__name__:<26}{widgets:>10}{micros:>12.1f}{memory:>14.0f}{relayout:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
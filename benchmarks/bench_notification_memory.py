@@ -0,0 +1,53 @@
+"""Memory held by a loaded feed: raw dicts vs Notification objects vs columns.
+
+Needs no window, so it runs under plain Python. Run from the repository root:
+
+    python -m benchmarks.bench_notification_memory [count]
+"""
+import gc
+import json
+import sys
+import tracemalloc
+
+from benchmarks.synthetic import make_notifications
+from services.notification_backends import assign_ids
+from services.notification_model import Notification, NotificationColumns
+
+
+def load_dicts(text):
+    return assign_ids(json.loads(text))
+
+
+def load_objects(text):
+    return [Notification.from_dict(record) for record in load_dicts(text)]
+
+
+def load_columns(text):
+    return NotificationColumns(load_dicts(text))
+
+
+def measure(load, text):
+    """Return the bytes still allocated once `load(text)` returned (temporaries excluded)."""
+    gc.collect()
+    tracemalloc.start()
+    records = load(text)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return memory
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    text = json.dumps(make_notifications(count))
+    baseline = None
+    print(f"{'layout':<16}{'MB':>10}{'bytes/item':>14}{'vs dicts':>10}")
+    for name, load in (('dicts', load_dicts), ('Notification', load_objects), ('columns', load_columns)):
+        memory = measure(load, text)
+        baseline = baseline or memory
+        print(f"{name:<16}{memory / 1e6:>10.1f}{memory / count:>14.0f}{memory / baseline:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""SideMenu slide: frame times and layout passes while the drawer opens and closes.
+
+Every layout class is instrumented to count do_layout() calls; the counts cover the
+frames of the slide itself, after the frame that attaches the drawer.
+Run from the repository root (under xvfb-run -a without a display):
+
+    python -m benchmarks.bench_side_menu
+"""
+import functools
+import os
+import tempfile
+import time
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from kivy.animation import Animation  # noqa: E402
+from kivy.base import EventLoop  # noqa: E402
+from kivy.core.window import Window  # noqa: E402
+from kivy.uix.layout import Layout  # noqa: E402
+from kivy.uix.screenmanager import ScreenManager  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+layout_passes = [0]
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def count_layout_passes():
+    """Wrap do_layout of every layout class; must run before the widgets are created."""
+    from panels import home_panel  # noqa: F401 - imports every layout class the panel uses
+
+    for cls in set(_subclasses(Layout)):
+        if 'do_layout' not in cls.__dict__:
+            continue
+
+        def wrap(function):
+            @functools.wraps(function)
+            def do_layout(*args, **kwargs):
+                layout_passes[0] += 1
+                return function(*args, **kwargs)
+            return do_layout
+        cls.do_layout = wrap(cls.__dict__['do_layout'])
+
+
+def run_frames(seconds, until=None):
+    """Run the event loop for `seconds`, or until `until()` is true, returning every frame's duration."""
+    durations = []
+    end = time.perf_counter() + seconds
+    last = time.perf_counter()
+    while time.perf_counter() < end and not (until and until()):
+        EventLoop.idle()
+        now = time.perf_counter()
+        durations.append(now - last)
+        last = now
+    return durations
+
+
+def measure(action):
+    """Start `action` and return (median frame ms, worst frame ms, layout passes) for the slide.
+
+    Timing stops in the slide Animation's on_complete, so the idle frames after the
+    slide are not counted.
+    """
+    done = []
+    start = Animation.start
+
+    def start_and_watch(animation, widget):
+        animation.bind(on_complete=lambda *args: done.append(True))
+        return start(animation, widget)
+    Animation.start = start_and_watch
+    try:
+        action()
+    finally:
+        Animation.start = start
+    run_frames(0.02, until=lambda: done)  # The frame that attaches the drawer
+    layout_passes[0] = 0
+    durations = sorted(run_frames(5, until=lambda: done))
+    passes = layout_passes[0]
+    return durations[len(durations) // 2] * 1000, durations[-1] * 1000, passes
+
+
+def main():
+    # The home panel creates its data files in ./data, keep them out of the checkout
+    workdir = tempfile.mkdtemp(prefix='scheduler-bench-')
+    os.symlink(os.path.join(REPO_DIR, 'images'), os.path.join(workdir, 'images'))
+    os.chdir(workdir)
+
+    count_layout_passes()
+    from panels.home_panel import HomePanel
+
+    manager = ScreenManager()
+    home = HomePanel(name='home')
+    manager.add_widget(home)
+    Window.add_widget(manager)
+    # Let the first load (notifications, agenda, clients) settle
+    run_frames(1.5)
+
+    print(f"{'slide':<8}{'median ms':>10}{'worst ms':>10}{'layouts':>10}")
+    for name, action in (('open', home.side_menu.open), ('close', home.side_menu.close)):
+        median, worst, passes = measure(action)
+        print(f"{name:<8}{median:>10.1f}{worst:>10.1f}{passes:>10}")
+
+
+if __name__ == '__main__':
+    main()
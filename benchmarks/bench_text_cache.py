@@ -0,0 +1,104 @@
+"""Text texture cache: hit rate and render time saved over a large feed.
+
+Requests the time, title and duration textures of every notification in a synthetic
+feed, as the list rows do, through a fresh cache, after checking that a CachedLabel's
+texture follows changes of its text. Rendering every text without the
+cache is timed on the first `--uncached` rows and scaled up to the whole feed.
+Run from the repository root:
+
+    python -m benchmarks.bench_text_cache [--count 50000] [--capacity 1024]
+"""
+import argparse
+import gc
+import os
+import time
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+
+from kivy.core.text import Label as CoreLabel  # noqa: E402
+from kivy.core.window import Window  # noqa: E402,F401 - creates the GL context for textures
+from kivy.metrics import dp  # noqa: E402
+
+from benchmarks.synthetic import make_notifications  # noqa: E402
+from widgets.text_cache import CachedLabel, TextTextureCache  # noqa: E402
+
+
+def texts(notification):
+    """Yield (text, options) for the textures of one row, like CompactNotificationItem."""
+    yield notification['time'], {'font_size': dp(16), 'bold': False}
+    yield notification['title'], {'font_size': dp(16), 'bold': True}
+    if notification.get('duration'):
+        yield notification['duration'], {'font_size': dp(14), 'bold': False}
+
+
+def render_uncached(notifications):
+    """Render every text of `notifications`; return (requests, seconds)."""
+    requests = 0
+    gc.collect()
+    start = time.perf_counter()
+    for notification in notifications:
+        for text, options in texts(notification):
+            label = CoreLabel(text=text, **options)
+            label.refresh()
+            requests += 1
+    return requests, time.perf_counter() - start
+
+
+def render_cached(notifications, cache):
+    """Request every text of `notifications` from `cache`; return seconds."""
+    gc.collect()
+    start = time.perf_counter()
+    for notification in notifications:
+        for text, options in texts(notification):
+            cache.texture(text, **options)
+    return time.perf_counter() - start
+
+
+def check_cached_label():
+    """Check that a CachedLabel's texture follows its text, including from and to empty text."""
+    label = CachedLabel(text='', font_size=dp(16))
+    label.texture_update()
+    assert label.texture is None, 'empty text has a texture'
+    label.text = '09:00'
+    label.texture_update()
+    first = label.texture
+    assert first is not None, 'text set after creation has no texture'
+    label.text = '09:00 - 10:30'
+    label.texture_update()
+    assert label.texture is not first and label.texture.width > first.width, 'texture not updated for new text'
+    label.text = ''
+    label.texture_update()
+    assert label.texture is None and tuple(label.texture_size) == (0, 0), 'cleared text still has a texture'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Text texture cache benchmark.')
+    parser.add_argument('--count', type=int, default=50000, help='Notifications in the feed')
+    parser.add_argument('--capacity', type=int, default=1024, help='Cache capacity, in textures')
+    parser.add_argument('--uncached', type=int, default=2000, help='Rows rendered without the cache')
+    arguments = parser.parse_args()
+
+    check_cached_label()
+    notifications = make_notifications(arguments.count)
+    sample = notifications[:arguments.uncached]
+    sample_requests, sample_seconds = render_uncached(sample)
+    per_request = sample_seconds / sample_requests
+
+    cache = TextTextureCache(arguments.capacity)
+    cached_seconds = render_cached(notifications, cache)
+    stats = cache.stats()
+    uncached_seconds = per_request * stats['requests']
+
+    print(f"{arguments.count} notifications, {stats['requests']} text requests, capacity {arguments.capacity}")
+    print(f"  distinct textures   {stats['misses']:>10}")
+    print(f"  hit rate            {stats['hit_rate'] * 100:>9.2f}%")
+    print(f"  evictions           {stats['evictions']:>10}")
+    print(f"  render per text     {per_request * 1e6:>8.1f} us")
+    print(f"  uncached (scaled)   {uncached_seconds * 1000:>8.1f} ms")
+    print(f"  cached              {cached_seconds * 1000:>8.1f} ms")
+    print(f"  render time saved   {(uncached_seconds - cached_seconds) * 1000:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""Headless benchmark suite for the panels and notification loading.
+
+Generates notifications.json files of several sizes in a temporary directory and
+measures the panels against them. Every timing is the fastest of several repeats.
+Results are compared with benchmarks/baseline.json: the run fails when a gated
+metric regresses by more than the threshold and by more than its noise floor, and
+still does when its size is measured again (a busy spell on a shared machine can
+slow every repeat of one run). The other metrics vary too much between runs of
+the same code to fail on; their changes are reported only.
+
+    python -m benchmarks.run                    # compare with the baseline
+    python -m benchmarks.run --update-baseline  # record a new baseline
+    python -m benchmarks.run --threshold 0.5 --sizes 10 1000 --repeats 3
+
+On a machine without a display, run it under a virtual one (xvfb-run -a ...).
+"""
+import argparse
+import gc
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+os.environ.setdefault('KIVY_NO_FILELOG', '1')
+# Don't wait for the next frame at 60 fps between ticks: a load that just misses a
+# frame would otherwise take 17 ms longer, which is pacing rather than work
+os.environ.setdefault('KCFG_GRAPHICS_MAXFPS', '0')
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(REPO_DIR, 'benchmarks', 'baseline.json')
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+# Building widget-tree items for the largest feeds would take minutes and gigabytes
+ITEM_LIMIT = 1000
+DEFAULT_REPEATS = 5
+
+# Metrics stable enough run-to-run to fail the job on; the rest are reported only
+GATED_METRICS = {
+        'check_for_notifications_cold_ms',
+        'load_notifications_ms',
+        'reenter_notifications_ms',
+        'load_peak_kb',
+        'filter_notifications_ms',
+        'notification_item_us',
+}
+
+# Changes smaller than these, by unit, are noise whatever their relative size
+NOISE_FLOORS = {'_ms': 1.0, '_us': 1.0, '_kb': 64.0}
+
+
+def pump(condition, timeout=120.0):
+    """Run the kivy event loop until `condition()` is true."""
+    from kivy.base import EventLoop
+
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise RuntimeError("Timed out waiting for the panel")
+        EventLoop.idle()
+
+
+def timed(function, repeats, setup=None):
+    """Return the fastest wall time of `repeats` calls of `function()` in milliseconds.
+
+    `setup()`, when given, runs untimed before each call, e.g. to start from a cold store.
+    """
+    best = None
+    for _ in range(repeats):
+        if setup is not None:
+            setup()
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_size(size, repeats):
+    """Run every benchmark against a feed of `size` notifications."""
+    from benchmarks.bench_notification_item import measure
+    from benchmarks.synthetic import write_notifications
+    from panels.home_panel import HomePanel
+    from panels.notifications_panel import NotificationItem, NotificationsPanel
+    from services import notification_store
+    from services.notification_pages import DEFAULT_PAGE_SIZE
+    from services.notification_query import list_filters
+    from services.reminders import ReminderQueue
+
+    write_notifications(notification_store.NOTIFICATIONS_PATH, size)
+    results = {}
+
+    def cold():
+        # Drop the stores, so the next call reads the file again
+        notification_store._stores.clear()
+
+    home = HomePanel(name='home')
+
+    def check():
+        # The check runs on a worker thread; time it until the bell is updated
+        home.check_for_notifications()
+        pump(lambda: home._check_task is None)
+
+    results['check_for_notifications_cold_ms'] = timed(check, repeats, setup=cold)
+    results['check_for_notifications_warm_ms'] = timed(check, repeats)
+
+    panel = NotificationsPanel(name='notifications')
+
+    def load():
+        panel.load_notifications()
+        pump(lambda: panel._load_task is None and panel._feeder is None)
+
+    results['load_notifications_ms'] = timed(load, repeats, setup=cold)
+    results['reenter_notifications_ms'] = timed(load, repeats)
+
+    # Peak Python memory of a cold load
+    notification_store._stores.clear()
+    gc.collect()
+    tracemalloc.start()
+    load()
+    results['load_peak_kb'] = tracemalloc.get_traced_memory()[1] / 1024.
+    tracemalloc.stop()
+
+    # Typing a title filter and clearing it again: the first page of the list for every keystroke
+    store = notification_store.get_store()
+    today = date.today()
+    results['filter_notifications_ms'] = timed(lambda: [
+            store.list_page(list_filters(text), today, None, DEFAULT_PAGE_SIZE)
+            for text in ('m', 'me', 'mee', 'meet', '')
+    ], repeats)
+
+    # Schedule queries, averaged over many calls (they are bisects, far below a millisecond)
+    schedule = notification_store.get_store().schedule()
+    queries = 1000
+    results['schedule_query_us'] = timed(lambda: [
+            (schedule.next_after(minute), schedule.overlapping(minute, minute + 30, limit=10), schedule.free_slots())
+            for minute in range(0, 24 * 60, 24 * 60 // queries)
+    ], repeats) * 1000 / queries
+
+    # Reminder queue: add every notification, then cancel them all; per operation
+    queue = ReminderQueue(on_due=lambda due: None)
+    start = time.time() + 3600
+    results['reminder_queue_us'] = timed(lambda: (
+            [queue.add(record['id'], start + position) for position, record in enumerate(schedule)],
+            [queue.cancel(record['id']) for record in schedule]
+    ), repeats) * 1000 / (2 * max(size, 1))
+
+    count = min(size, ITEM_LIMIT)
+    results['notification_item_us'] = min(measure(NotificationItem, count)[1] for _ in range(repeats))
+    return results
+
+
+def run(sizes, repeats=DEFAULT_REPEATS):
+    """Run the suite in a scratch directory and return {size: {metric: value}}."""
+    from kivy.core.window import Window  # noqa: F401 - GL context for textures
+
+    workdir = tempfile.mkdtemp(prefix='scheduler-bench-')
+    os.symlink(os.path.join(REPO_DIR, 'images'), os.path.join(workdir, 'images'))
+    os.makedirs(os.path.join(workdir, 'data'))
+    os.chdir(workdir)
+
+    results = {}
+    for size in sizes:
+        results[str(size)] = bench_size(size, repeats)
+        print(f"{size:>7} notifications: " + ', '.join(
+                f"{name}={value:.1f}" for name, value in results[str(size)].items()
+        ))
+    results['max_rss_kb'] = {'all': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}
+    return results
+
+
+def noise_floor(name):
+    """Return the smallest change of metric `name` that isn't noise, in the metric's own unit."""
+    for suffix, floor in NOISE_FLOORS.items():
+        if name.endswith(suffix):
+            return floor
+    return 0.0
+
+
+def compare(results, baseline, threshold):
+    """Return (regressions, changes) beyond `threshold` (0.25 = 25% slower/bigger), as (size, text) lists.
+
+    Only gated metrics are regressions; the other metrics beyond the threshold are
+    `changes`, reported without failing. Changes below a metric's noise floor are
+    neither.
+    """
+    regressions = []
+    changes = []
+    for size, metrics in results.items():
+        for name, value in metrics.items():
+            reference = baseline.get(size, {}).get(name)
+            if not reference:
+                continue
+            change = (value - reference) / reference
+            if change <= threshold or value - reference < noise_floor(name):
+                continue
+            line = f"{name} @ {size}: {reference:.1f} -> {value:.1f} (+{change * 100:.0f}%)"
+            (regressions if name in GATED_METRICS else changes).append((size, line))
+    return regressions, changes
+
+
+def confirm(results, sizes, repeats):
+    """Measure `sizes` again and keep the faster (smaller) value of every metric in `results`."""
+    print("Measuring again: " + ', '.join(str(size) for size in sizes))
+    again = run(sizes, repeats)
+    for size in sizes:
+        for name, value in again[str(size)].items():
+            results[str(size)][name] = min(results[str(size)][name], value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless panel benchmarks.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--threshold', type=float, default=float(os.environ.get('BENCH_THRESHOLD', 0.25)),
+                        help='Allowed relative regression before failing (default 0.25)')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help='Time every metric this many times and keep the fastest (default 5)')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='Store these results as the baseline')
+    parser.add_argument('--output', help='Also write the results to this JSON file')
+    arguments = parser.parse_args()
+
+    sys.path.insert(0, REPO_DIR)
+    results = run(arguments.sizes, arguments.repeats)
+
+    baseline = None
+    regressions = changes = []
+    if not arguments.update_baseline and os.path.exists(arguments.baseline):
+        with open(arguments.baseline) as file:
+            baseline = json.load(file)
+        regressions, changes = compare(results, baseline, arguments.threshold)
+        if regressions:
+            # Only fail on regressions that reproduce
+            confirm(results, sorted({int(size) for size, line in regressions}), arguments.repeats)
+            regressions, changes = compare(results, baseline, arguments.threshold)
+
+    if arguments.output:
+        with open(arguments.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if arguments.update_baseline:
+        with open(arguments.baseline, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {arguments.baseline}")
+        return
+
+    if baseline is None:
+        print("No baseline recorded yet, run with --update-baseline to create one")
+        return
+
+    if changes:
+        print(f"Changes beyond {arguments.threshold * 100:.0f}% in metrics too noisy to gate on:")
+        for size, change in changes:
+            print("  " + change)
+    if regressions:
+        print(f"Regressions beyond {arguments.threshold * 100:.0f}%:")
+        for size, regression in regressions:
+            print("  " + regression)
+        sys.exit(1)
+    print(f"No regressions beyond {arguments.threshold * 100:.0f}%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Synthetic notifications.json files for the benchmarks."""
+import json
+import random
+
+TITLES = [
+        "Client Meeting", "Team Standup", "Design Conference", "Project Deadline",
+        "Follow-up Call", "Initial Consultation", "Check-up", "Therapy Session"
+]
+DURATIONS = ["15m", "30m", "45m", "1h", "2h", "5h", "11h", None]
+
+
+def make_notifications(count, seed=0):
+    """Return `count` notification dicts in the app's format, reproducible for a given seed."""
+    generator = random.Random(seed)
+    notifications = []
+    for index in range(count):
+        hour = generator.randrange(1, 13)
+        minute = generator.choice((0, 15, 30, 45))
+        notification = {
+                "time": f"{hour}:{minute:02d} {generator.choice(('am', 'pm'))}",
+                "title": generator.choice(TITLES)
+        }
+        duration = generator.choice(DURATIONS)
+        if duration:
+            notification["duration"] = duration
+        notifications.append(notification)
+    return notifications
+
+
+def write_notifications(path, count, seed=0):
+    """Write a notifications.json with `count` entries to `path`."""
+    with open(path, 'w') as file:
+        json.dump(make_notifications(count, seed), file)
+
+
+FIRST_NAMES = [
+        "Alice", "Brian", "Carla", "David", "Elena", "Farid", "Grace", "Hassan",
+        "Irene", "Jonas", "Karim", "Laura", "Maya", "Nadia", "Omar", "Paula"
+]
+LAST_NAMES = [
+        "Johnson", "Smith", "Gomez", "Lee", "Novak", "Rahimi", "Okafor", "Schmidt",
+        "Tanaka", "Moreau", "Silva", "Kowalski", "Haddad", "Andersen", "Rossi", "Ivanova"
+]
+NOTES = ["", "", "Prefers mornings", "Follow-up in two weeks", "Insurance pending", "New patient"]
+
+
+def make_clients(count, seed=0):
+    """Return `count` client dicts (name, phone, notes), reproducible for a given seed."""
+    generator = random.Random(seed)
+    return [
+            {
+                    "name": f"{generator.choice(FIRST_NAMES)} {generator.choice(LAST_NAMES)}",
+                    "phone": f"555-{generator.randrange(10000):04d}",
+                    "notes": generator.choice(NOTES)
+            }
+            for _ in range(count)
+    ]
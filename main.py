@@ -1,8 +1,34 @@
-from kivy.app import App
-from kivy.uix.screenmanager import ScreenManager
+import os
+import sys
 
-# Import panels
-from panels.home_panel import HomePanel
+from services import log, startup_profiler
+
+# Must be handled before kivy is imported, kivy rejects unknown command line options
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+if PROFILE_STARTUP:
+    sys.argv.remove('--profile-startup')
+    startup_profiler.start()
+
+INSTRUMENT = '--instrument' in sys.argv
+if INSTRUMENT:
+    sys.argv.remove('--instrument')
+
+# Sync with the clinic server only when one is configured, e.g. http://127.0.0.1:8765/sync
+SYNC_URL = os.environ.get('SCHEDULER_SYNC_URL', '')
+
+# Debug output only with SCHEDULER_DEBUG=1; the last 200 events are kept for crash reports
+log.configure(ring_buffer=200)
+
+from kivy.app import App  # noqa: E402
+from kivy.clock import Clock  # noqa: E402
+
+from services import instrumentation  # noqa: E402
+
+# Must be enabled before the panels are imported, their hot paths are wrapped at import time
+if INSTRUMENT:
+    instrumentation.enable()
+
+from panels.screen_registry import LazyScreenManager  # noqa: E402
 
 
 class PatientSchedulerApp(App):
@@ -10,14 +36,71 @@ class PatientSchedulerApp(App):
         # Set app title
         self.title = 'Patient Scheduler'
 
-        # Create screen manager
-        sm = ScreenManager()
+        # Create screen manager; panel modules are imported when their screen is first needed
+        sm = LazyScreenManager()
+        sm.register('home', 'panels.home_panel:HomePanel')
+        sm.register('notifications', 'panels.notifications_panel:NotificationsPanel')
 
-        # Add panels to the screen manager
-        sm.add_widget(HomePanel())
+        # Add the first panel to the screen manager
+        sm.current = 'home'
 
         return sm
 
+    def on_start(self):
+        if PROFILE_STARTUP:
+            # Report once the first frame has been drawn
+            Clock.schedule_once(lambda dt: startup_profiler.finish())
+
+        if instrumentation.ENABLED:
+            from kivy.core.window import Window
+            from widgets.perf_overlay import PerfOverlay
+
+            instrumentation.start_frame_recording()
+            instrumentation.track_transitions(self.root)
+            Window.add_widget(PerfOverlay())
+
+        # Build the other screens once the app is idle, so first navigation is instant
+        self.root.preload_when_idle()
+
+        # Services are imported where they start rather than with this module
+        from services.live_updates import get_live_notifications
+        from services.reminders import get_reminders
+
+        # Push data file changes to the panels while the app runs
+        get_live_notifications().start()
+
+        # Remind about today's appointments as they start
+        get_reminders().start()
+
+        # Sync runs on its own thread and writes to the local store the panels read from;
+        # without a server its module (and urllib) is never imported
+        if SYNC_URL:
+            from services.sync import get_sync
+            get_sync().start(SYNC_URL)
+
+    def on_resume(self):
+        from services.live_updates import get_live_notifications
+
+        # The polling watcher's Clock didn't tick while paused, and may have backed off to 30 s
+        get_live_notifications().resume()
+
+    def on_stop(self):
+        from services.live_updates import get_live_notifications
+        from services.notification_writer import get_writer
+        from services.reminders import get_reminders
+
+        if SYNC_URL:
+            from services.sync import get_sync
+            # Unsent changes stay in the outbox until the next start
+            get_sync().stop()
+        get_reminders().stop()
+        get_live_notifications().stop()
+        # Don't lose changes still waiting for their debounced write
+        get_writer().flush()
+
+        if instrumentation.ENABLED:
+            instrumentation.export()
+
 
 if __name__ == '__main__':
-    PatientSchedulerApp().run()
\ No newline at end of file
+    PatientSchedulerApp().run()
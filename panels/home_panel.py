@@ -1,18 +1,30 @@
-import json
 import os
+from datetime import date, datetime
 
 from kivy.animation import Animation
-from kivy.graphics import Color, Rectangle, RoundedRectangle
+from kivy.clock import Clock
+from kivy.graphics import PopMatrix, PushMatrix, Translate
+from kivy.properties import NumericProperty
 from kivy.metrics import dp
 from kivy.uix.behaviors import ButtonBehavior
 from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.floatlayout import FloatLayout
 from kivy.uix.image import Image
 from kivy.uix.label import Label
 from kivy.uix.relativelayout import RelativeLayout
-from kivy.uix.screenmanager import Screen, ScreenManager
-from kivy.uix.scrollview import ScrollView
+from kivy.uix.screenmanager import Screen
 from kivy.utils import get_color_from_hex
 
+from panels.screen_registry import LazyScreenManager
+from services.background import BackgroundTask
+from services.instrumentation import timed
+from services.log import get_logger
+from services.notification_store import SAMPLE_NOTIFICATIONS, get_store
+from widgets.background import ColoredBoxLayout
+from widgets.icon_cache import get_icon
+
+log = get_logger(__name__)
+
 
 class MenuButton(ButtonBehavior, Image):
     def __init__(self, **kwargs):
@@ -25,33 +37,33 @@ class NotificationButton(ButtonBehavior, Image):
 
 
 class SideMenu(RelativeLayout):
+    # Drawer position as a fraction of its width: -1 is off-screen to the left, 0 is open
+    slide = NumericProperty(-1)
+
     def __init__(self, **kwargs):
         super(SideMenu, self).__init__(size_hint=(1, 1))
-        self.opacity = 0
         self.visible = False
 
-        # Overlay for darkening the background
-        self.overlay = BoxLayout(size_hint=(1, 1))
-        with self.overlay.canvas.before:
-            Color(0, 0, 0, 0.5)  # Semi-transparent black
-            self.overlay_rect = Rectangle(pos=self.overlay.pos, size=self.overlay.size)
-        self.overlay.bind(pos=self._update_overlay_rect, size=self._update_overlay_rect)
-
-        # Menu panel
-        self.menu_panel = BoxLayout(
+        # Overlay for darkening the background (semi-transparent black)
+        self.overlay = ColoredBoxLayout(fill_color=(0, 0, 0, 0.5), size_hint=(1, 1))
+
+        # The drawer slides its contents with a canvas Translate, so the
+        # animation moves pixels on the GPU without laying anything out
+        self.drawer = FloatLayout()
+        with self.drawer.canvas.before:
+            PushMatrix()
+            self.slide_translate = Translate()
+        with self.drawer.canvas.after:
+            PopMatrix()
+
+        # Menu panel, with a darker background; laid out once, in its open position
+        self.menu_panel = ColoredBoxLayout(
+                fill_color=get_color_from_hex("#333333"),
                 orientation='vertical',
                 size_hint=(0.5, 1),
-                pos_hint={'x': -0.5, 'y': 0}  # Start off-screen to the left
+                pos_hint={'x': 0, 'y': 0}
         )
 
-        # Add background color to menu panel
-        with self.menu_panel.canvas.before:
-            Color(*get_color_from_hex("#333333"))  # Darker background for menu
-            self.menu_bg = Rectangle(pos=self.menu_panel.pos, size=self.menu_panel.size)
-
-        # Update rectangle position and size when layout changes
-        self.menu_panel.bind(pos=self._update_menu_rect, size=self._update_menu_rect)
-
         # Menu items container - explicitly at the top with padding
         self.menu_items = BoxLayout(
                 orientation='vertical',
@@ -87,319 +99,66 @@ class SideMenu(RelativeLayout):
         # Add filler to push menu items to the top
         self.menu_panel.add_widget(BoxLayout())
 
-        # Add overlay and menu panel to the layout
-        self.add_widget(self.overlay)
-        self.add_widget(self.menu_panel)
+        self.drawer.add_widget(self.menu_panel)
+        # Keep the offset right when the panel is (re)sized, e.g. on the first open
+        self.menu_panel.bind(width=lambda instance, value: self.on_slide(self, self.slide))
+
+        # Overlay and drawer are only attached while the menu is open, so a closed
+        # menu is neither drawn nor offered touches
 
         # Bind overlay touch to close menu
         self.overlay.bind(on_touch_down=self._on_overlay_touch)
 
-    def _update_overlay_rect(self, instance, value):
-        """Update the overlay rectangle position and size."""
-        self.overlay_rect.pos = instance.pos
-        self.overlay_rect.size = instance.size
-
-    def _update_menu_rect(self, instance, value):
-        """Update the menu rectangle position and size."""
-        self.menu_bg.pos = instance.pos
-        self.menu_bg.size = instance.size
+    def on_slide(self, instance, value):
+        """Move the drawer; only the Translate changes."""
+        self.slide_translate.x = value * self.menu_panel.width
 
     def _on_overlay_touch(self, instance, touch):
         """Close menu when overlay is touched."""
         if self.visible and instance.collide_point(*touch.pos):
-            print("Overlay clicked - closing menu")
+            log.debug("Overlay clicked - closing menu")
             self.close()
             return True
 
     def open(self):
         """Open the side menu with animation."""
-        print("Opening menu")
+        log.debug("Opening menu")
         if not self.visible:
-            self.opacity = 1
             self.visible = True
+            Animation.cancel_all(self, 'slide')
+            if self.overlay.parent is None:
+                self.add_widget(self.overlay)
+                self.add_widget(self.drawer)
             # Animate the menu panel sliding in from left
-            anim = Animation(pos_hint={'x': 0, 'y': 0}, duration=0.3)
-            anim.start(self.menu_panel)
+            anim = Animation(slide=0, duration=0.3)
+            anim.start(self)
 
     def close(self):
         """Close the side menu with animation."""
-        print("Closing menu")
+        log.debug("Closing menu")
         if self.visible:
+            self.visible = False
+            Animation.cancel_all(self, 'slide')
             # Animate the menu panel sliding out to left
-            anim = Animation(pos_hint={'x': -0.5, 'y': 0}, duration=0.3)
+            anim = Animation(slide=-1, duration=0.3)
             anim.bind(on_complete=self._after_close)
-            anim.start(self.menu_panel)
+            anim.start(self)
 
     def _after_close(self, *args):
-        """Called after close animation completes."""
-        self.opacity = 0
-        self.visible = False
-
-
-class NotificationItem(BoxLayout):
-    def __init__(self, time, title, duration=None, **kwargs):
-        super(NotificationItem, self).__init__(**kwargs)
-        self.orientation = 'vertical'
-        self.size_hint_y = None
-        self.height = dp(100)
-        self.padding = [dp(15), dp(10)]
-        self.spacing = dp(5)
-
-        # Add background with rounded corners and shadow effect
-        with self.canvas.before:
-            # Shadow effect (slightly larger, darker rectangle behind)
-            Color(0.85, 0.85, 0.85, 1)  # Light gray for shadow
-            self.shadow = RoundedRectangle(
-                    pos=(self.pos[0] + dp(2), self.pos[1] - dp(2)),
-                    size=(self.size[0], self.size[1]),
-                    radius=[dp(10)]
-            )
-
-            # Main background (white rounded rectangle)
-            Color(*get_color_from_hex("#FFFFFF"))
-            self.bg = RoundedRectangle(
-                    pos=self.pos,
-                    size=self.size,
-                    radius=[dp(10)]
-            )
-
-        # Update rectangle position and size when layout changes
-        self.bind(pos=self._update_rect, size=self._update_rect)
-
-        # Create horizontal layout for time and title
-        time_title_layout = BoxLayout(size_hint_y=None, height=dp(40))
-
-        # Time label
-        time_label = Label(
-                text=time,
-                font_size=dp(16),
-                color=get_color_from_hex("#666666"),
-                size_hint_x=None,
-                width=dp(100),
-                halign='left',
-                valign='middle'
-        )
-        time_label.bind(texture_size=time_label.setter('text_size'))
-
-        # Title label
-        title_label = Label(
-                text=title,
-                font_size=dp(16),
-                bold=True,
-                color=get_color_from_hex("#333333"),
-                halign='left',
-                valign='middle'
-        )
-        title_label.bind(texture_size=title_label.setter('text_size'))
-
-        # Add time and title to horizontal layout
-        time_title_layout.add_widget(time_label)
-        time_title_layout.add_widget(title_label)
-
-        # Create duration layout if duration provided
-        if duration:
-            duration_layout = BoxLayout(size_hint_y=None, height=dp(30))
-            duration_label = Label(
-                    text=duration,
-                    font_size=dp(14),
-                    color=get_color_from_hex("#999999"),
-                    size_hint_x=None,
-                    width=dp(100),
-                    halign='left',
-                    valign='middle'
-            )
-            duration_label.bind(texture_size=duration_label.setter('text_size'))
-
-            # Add clock icon
-            clock_icon = Image(
-                    source='./images/clock.png',  # You might need to add this icon
-                    size_hint=(None, None),
-                    size=(dp(16), dp(16))
-            )
-
-            duration_layout.add_widget(clock_icon)
-            duration_layout.add_widget(duration_label)
-
-        # Notification bell
-        bell_icon = Image(
-                source='./images/notification.png',
-                size_hint=(None, None),
-                size=(dp(24), dp(24)),
-                pos_hint={'right': 1}
-        )
-
-        # Add widgets to main layout
-        self.add_widget(time_title_layout)
-        if duration:
-            self.add_widget(duration_layout)
-
-        # Add bell icon
-        bell_layout = BoxLayout(size_hint_y=None, height=dp(24))
-        bell_layout.add_widget(Label())  # Spacer
-        bell_layout.add_widget(bell_icon)
-        self.add_widget(bell_layout)
-
-    def _update_rect(self, instance, value):
-        """Update the rectangle position and size."""
-        self.bg.pos = instance.pos
-        self.bg.size = instance.size
-        # Update shadow position to create shadow effect
-        self.shadow.pos = (instance.pos[0] + dp(2), instance.pos[1] - dp(2))
-        self.shadow.size = instance.size
-
-
-class NotificationsPanel(Screen):
-    def __init__(self, **kwargs):
-        super(NotificationsPanel, self).__init__(**kwargs)
-
-        # Main layout
-        self.layout = BoxLayout(orientation='vertical')
-
-        # Top ribbon with back button and panel name
-        self.top_ribbon = BoxLayout(
-                size_hint=(1, None),
-                height=dp(60),
-                padding=[dp(15), dp(10)],
-                spacing=dp(10)
-        )
-
-        # Add background color to top ribbon
-        with self.top_ribbon.canvas.before:
-            Color(*get_color_from_hex("#F6F6F6"))  # Light gray color
-            self.top_bg = Rectangle(pos=self.top_ribbon.pos, size=self.top_ribbon.size)
-
-        # Update rectangle position and size when layout changes
-        self.top_ribbon.bind(pos=self._update_rect, size=self._update_rect)
-
-        # Back button with arrow icon
-        self.back_button = MenuButton(
-                source='./images/leftArrow.png',
-                size_hint=(None, None),
-                size=(dp(33), dp(33))
-        )
-        self.back_button.bind(on_release=self.go_back_to_home)
-
-        # Panel name label
-        self.panel_label = Label(
-                text="Notifications",
-                font_size=dp(20),
-                bold=True,
-                color=get_color_from_hex("#19081c")
-        )
-
-        # Add back button and title to top ribbon
-        self.top_ribbon.add_widget(self.back_button)
-        self.top_ribbon.add_widget(self.panel_label)
-        # Add empty widget to balance layout
-        empty_widget = BoxLayout(size_hint=(None, None), size=(dp(33), dp(33)))
-        self.top_ribbon.add_widget(empty_widget)
-
-        # Add top ribbon to main layout
-        self.layout.add_widget(self.top_ribbon)
-
-        # Content area with notifications
-        self.content_area = ScrollView(do_scroll_x=False)
-
-        # Container for notification items
-        self.notifications_container = BoxLayout(
-                orientation='vertical',
-                padding=[dp(15), dp(15)],
-                spacing=dp(15),
-                size_hint_y=None
-        )
-        # Bind height to children to ensure proper scrolling
-        self.notifications_container.bind(minimum_height=self.notifications_container.setter('height'))
-
-        # Add container to scroll view
-        self.content_area.add_widget(self.notifications_container)
-
-        # Add background color to content area
-        with self.content_area.canvas.before:
-            Color(*get_color_from_hex("#F0F0F0"))  # Light gray background
-            self.content_bg = Rectangle(pos=self.content_area.pos, size=self.content_area.size)
-
-        # Update content rectangle position and size when layout changes
-        self.content_area.bind(pos=self._update_content_rect, size=self._update_content_rect)
-
-        # Add content area to main layout
-        self.layout.add_widget(self.content_area)
-
-        # Add main layout to screen
-        self.add_widget(self.layout)
-
-        # Load notifications from JSON when panel is shown
-        self.bind(on_pre_enter=self.load_notifications)
-
-    def _update_rect(self, instance, value):
-        """Update the rectangle position and size."""
-        self.top_bg.pos = instance.pos
-        self.top_bg.size = instance.size
-
-    def _update_content_rect(self, instance, value):
-        """Update the content rectangle position and size."""
-        self.content_bg.pos = instance.pos
-        self.content_bg.size = instance.size
-
-    def go_back_to_home(self, instance):
-        """Go back to home screen."""
-        print("Back button clicked - returning to home panel")
-        if self.manager:
-            # Check if 'home' screen exists in the screen manager
-            if 'home' in self.manager.screen_names:
-                self.manager.current = 'home'
-            else:
-                print("Warning: 'home' screen not found in screen manager")
-                # Fallback - try to find any available screen
-                if len(self.manager.screen_names) > 0 and self.manager.screen_names[0] != self.name:
-                    self.manager.current = self.manager.screen_names[0]
-                else:
-                    print("Error: No alternative screens available")
-
-    def load_notifications(self, *args):
-        """Load notifications from JSON file."""
-        self.notifications_container.clear_widgets()
-        try:
-            # Check if notifications.json exists
-            if os.path.exists('./data/notifications.json'):
-                with open('./data/notifications.json', 'r') as file:
-                    notifications = json.load(file)
-
-                # Add notifications to the container
-                for notification in notifications:
-                    time = notification.get('time', '')
-                    title = notification.get('title', '')
-                    duration = notification.get('duration', None)
-
-                    self.notifications_container.add_widget(
-                            NotificationItem(time=time, title=title, duration=duration)
-                    )
-            else:
-                # Fallback to sample data if JSON doesn't exist
-                self.load_sample_notifications()
-
-        except Exception as e:
-            print(f"Error loading notifications: {e}")
-            # Fallback to sample data
-            self.load_sample_notifications()
-
-    def load_sample_notifications(self):
-        """Load sample notifications for testing."""
-        self.notifications_container.add_widget(
-                NotificationItem(time="9:00 am", title="Client Meeting", duration="5h")
-        )
-        self.notifications_container.add_widget(
-                NotificationItem(time="11:00 am", title="Team Standup", duration="5h")
-        )
-        self.notifications_container.add_widget(
-                NotificationItem(time="3:00 pm", title="Design Conference", duration="11h")
-        )
-        self.notifications_container.add_widget(
-                NotificationItem(time="4:30 pm", title="Project Deadline", duration="11h")
-        )
+        """Called after close animation completes: detach the overlay and drawer."""
+        if not self.visible:
+            self.remove_widget(self.overlay)
+            self.remove_widget(self.drawer)
 
 
 class HomePanel(Screen):
     def __init__(self, **kwargs):
+        # Imported here rather than with the module, which the app imports before its first frame
+        from services.live_updates import get_live_notifications
+        from services.reminders import get_reminders
+        from widgets.agenda import AgendaSummary
+        from widgets.client_search import ClientSearch
+
         super(HomePanel, self).__init__(**kwargs)
 
         # Notification status - default to False (no notifications)
@@ -408,25 +167,18 @@ class HomePanel(Screen):
         # Main layout
         self.layout = BoxLayout(orientation='vertical')
 
-        # Top ribbon with panel name, hamburger menu, and notification icon
-        self.top_ribbon = BoxLayout(
+        # Top ribbon with panel name, hamburger menu, and notification icon, on a light gray background
+        self.top_ribbon = ColoredBoxLayout(
+                fill_color=get_color_from_hex("#F6F6F6"),
                 size_hint=(1, None),
                 height=dp(60),
                 padding=[dp(15), dp(10)],
                 spacing=dp(10)
         )
 
-        # Add background color to top ribbon
-        with self.top_ribbon.canvas.before:
-            Color(*get_color_from_hex("#F6F6F6"))  # Light gray color
-            self.top_bg = Rectangle(pos=self.top_ribbon.pos, size=self.top_ribbon.size)
-
-        # Update rectangle position and size when layout changes
-        self.top_ribbon.bind(pos=self._update_rect, size=self._update_rect)
-
         # Hamburger menu button
         self.hamburger_menu = MenuButton(
-                source='./images/hamburgerMenu.png',
+                texture=get_icon('hamburgerMenu'),
                 size_hint=(None, None),
                 size=(dp(33), dp(33))
         )
@@ -442,7 +194,7 @@ class HomePanel(Screen):
 
         # Notification button with regular icon
         self.notification_icon = NotificationButton(
-                source='./images/notification.png',
+                texture=get_icon('notification'),
                 size_hint=(None, None),
                 size=(dp(33), dp(33))
         )
@@ -456,16 +208,28 @@ class HomePanel(Screen):
         # Add top ribbon to main layout
         self.layout.add_widget(self.top_ribbon)
 
-        # Content area (placeholder)
-        self.content_area = BoxLayout(orientation='vertical', padding=[dp(10), dp(10)])
-
-        # Add background color to content area
-        with self.content_area.canvas.before:
-            Color(*get_color_from_hex("#FFFFFF"))  # White color
-            self.content_bg = Rectangle(pos=self.content_area.pos, size=self.content_area.size)
+        # Content area, on a white background
+        self.content_area = ColoredBoxLayout(
+                fill_color=get_color_from_hex("#FFFFFF"),
+                orientation='vertical',
+                padding=[dp(10), dp(10)]
+        )
 
-        # Update content rectangle position and size when layout changes
-        self.content_area.bind(pos=self._update_content_rect, size=self._update_content_rect)
+        # Today's agenda, answered by the schedule index
+        self.agenda = AgendaSummary()
+        self.content_area.add_widget(self.agenda)
+
+        # Client directory search fills the rest of the content area
+        self.client_search = ClientSearch()
+        self.content_area.add_widget(self.client_search)
+        self._clients_loaded = False
+        # Today's appointments, and the day they were read for
+        self._schedule = None
+        self._schedule_day = None
+        self._agenda_task = None
+        self._agenda_event = None
+        # Reads the unread count for the bell
+        self._check_task = None
 
         # Add content area to main layout
         self.layout.add_widget(self.content_area)
@@ -480,94 +244,188 @@ class HomePanel(Screen):
         # Check for notifications when panel is shown
         self.bind(on_pre_enter=self.check_for_notifications)
 
-    def _update_rect(self, instance, value):
-        """Update the rectangle position and size."""
-        self.top_bg.pos = instance.pos
-        self.top_bg.size = instance.size
+        # List the clients the first time the panel is shown
+        self.bind(on_pre_enter=self.load_clients)
 
-    def _update_content_rect(self, instance, value):
-        """Update the content rectangle position and size."""
-        self.content_bg.pos = instance.pos
-        self.content_bg.size = instance.size
+        # Keep the agenda's "now" current while the panel stays on screen
+        self.bind(on_enter=self._start_agenda_clock)
+        self.bind(on_leave=self._stop_agenda_clock)
+
+        # Light the bell as soon as new notifications arrive
+        get_live_notifications().subscribe(self._on_notifications_changed)
+        get_reminders().subscribe(self._on_reminders_due)
 
     def open_menu(self, instance):
         """Open the side menu."""
-        print("Hamburger menu clicked")
+        log.debug("Hamburger menu clicked")
         self.side_menu.open()
 
     def show_notifications(self, instance):
         """Switch to notifications panel."""
-        print("Notification icon clicked")
+        log.debug("Notification icon clicked")
 
         if self.manager:
-            print("Switching to notifications panel")
-            # Check if notifications screen exists in manager
-            if 'notifications' not in self.manager.screen_names:
+            log.debug("Switching to notifications panel")
+            # A LazyScreenManager builds registered screens itself on first use
+            is_registered = getattr(self.manager, 'is_registered', self.manager.has_screen)
+            if not is_registered('notifications'):
                 # Create and add the notifications screen if it doesn't exist
+                from panels.notifications_panel import NotificationsPanel
                 notifications_screen = NotificationsPanel(name='notifications')
                 self.manager.add_widget(notifications_screen)
 
             # Switch to notifications screen
             self.manager.current = 'notifications'
 
-            # Reset notification icon after viewing
+            # Reset notification icon after viewing; the read flags are written in one batch,
+            # and only when there is something unread, so a second tap writes nothing
             self.set_has_notifications(False)
+            if get_store().unread_count() > 0:
+                from services.notification_writer import get_writer
+                get_writer().mark_all_read()
 
     def check_for_notifications(self, *args):
-        """Check if there are any notifications by looking for the JSON file."""
-        try:
-            # Check if notifications.json exists and has content
-            if os.path.exists('./data/notifications.json'):
-                with open('./data/notifications.json', 'r') as file:
-                    notifications = json.load(file)
-                    # Set notification indicator if there are notifications
-                    self.set_has_notifications(len(notifications) > 0)
-            else:
-                # Create directory if it doesn't exist
-                os.makedirs('./data', exist_ok=True)
-
-                # Create a sample notifications file for testing
-                sample_notifications = [
-                        {"time": "9:00 am", "title": "Client Meeting", "duration": "5h"},
-                        {"time": "11:00 am", "title": "Team Standup", "duration": "5h"},
-                        {"time": "3:00 pm", "title": "Design Conference", "duration": "11h"},
-                        {"time": "4:30 pm", "title": "Project Deadline", "duration": "11h"}
-                ]
-
-                with open('./data/notifications.json', 'w') as file:
-                    json.dump(sample_notifications, file)
-
-                # Set notification indicator to true for the sample data
-                self.set_has_notifications(True)
-
-        except Exception as e:
-            print(f"Error checking for notifications: {e}")
-            # Default to sample data behavior
-            self.set_has_notifications(True)
+        """Light the bell if there are unread notifications; the store is read on a worker thread."""
+        if self._check_task is not None:
+            self._check_task.cancel()
+        self._check_task = BackgroundTask(
+                self._read_unread,
+                on_done=self._on_unread_read,
+                on_error=self._on_unread_error
+        ).start()
+
+    @timed()
+    def _read_unread(self):
+        """Refresh the store and return True if anything is unread. Runs on a worker thread."""
+        store = get_store()
+        # Check if notifications.json exists and has content
+        if store.exists():
+            store.refresh()
+            return store.unread_count() > 0
+
+        # Create directory if it doesn't exist
+        os.makedirs(os.path.dirname(store.path), exist_ok=True)
+
+        # Create a sample notifications file for testing
+        store.backend.extend(SAMPLE_NOTIFICATIONS)
+
+        # Set notification indicator to true for the sample data
+        return True
+
+    def _on_unread_read(self, has_notifications):
+        """Main thread: update the bell from what the worker read."""
+        self._check_task = None
+        self.set_has_notifications(has_notifications)
+        # The agenda reads the same data, which now exists
+        self.refresh_agenda()
+
+    def _on_unread_error(self, error):
+        """Main thread: the worker failed to read the notifications."""
+        self._check_task = None
+        log.warning("Error checking for notifications: %s", error)
+        # Default to sample data behavior
+        self.set_has_notifications(True)
+        self.refresh_agenda()
+
+    def load_clients(self, *args):
+        """Fill the client list once, adding sample clients to an empty directory first."""
+        if self._clients_loaded:
+            return
+        self._clients_loaded = True
+        BackgroundTask(
+                self._prepare_directory,
+                on_done=lambda result: self.client_search.refresh(),
+                on_error=lambda error: log.warning("Error opening the client directory: %s", error)
+        ).start()
+
+    def _prepare_directory(self):
+        """Create the sample clients if there are none. Runs on a worker thread."""
+        from services.client_directory import SAMPLE_CLIENTS, get_directory
+
+        directory = get_directory()
+        if directory.count() == 0:
+            directory.extend(SAMPLE_CLIENTS)
+        # Synced notifications arrive as live deltas; merged clients need the list refreshed
+        directory.add_listener(self._on_clients_merged)
+
+    def refresh_agenda(self, *args):
+        """Fetch the schedule on a worker thread and show today's agenda from it."""
+        if self._agenda_task is not None:
+            self._agenda_task.cancel()
+        self._agenda_task = BackgroundTask(
+                self._read_schedule,
+                on_done=self._on_schedule_ready,
+                on_error=lambda error: log.warning("Error reading the schedule: %s", error)
+        ).start()
+
+    def _read_schedule(self):
+        """Refresh the store and return (today, today's schedule). Runs on a worker thread."""
+        store = get_store()
+        store.refresh()
+        today = date.today()
+        return today, store.schedule(today)
+
+    def _on_schedule_ready(self, result):
+        """Main thread: keep the schedule for the per-minute updates and show it."""
+        self._agenda_task = None
+        self._schedule_day, self._schedule = result
+        self._update_agenda()
+
+    def _update_agenda(self, *args):
+        """Show the agenda for the current minute; every query is a bisect on the schedule."""
+        if self._schedule is not None:
+            now = datetime.now()
+            if now.date() != self._schedule_day:
+                # Past midnight: the schedule is yesterday's
+                if self._agenda_task is None:
+                    self.refresh_agenda()
+                return
+            self.agenda.show(self._schedule, now.hour * 60 + now.minute)
+
+    def _start_agenda_clock(self, *args):
+        self._stop_agenda_clock()
+        self._agenda_event = Clock.schedule_interval(self._update_agenda, 60)
+
+    def _stop_agenda_clock(self, *args):
+        if self._agenda_event is not None:
+            self._agenda_event.cancel()
+            self._agenda_event = None
+
+    def _on_notifications_changed(self, delta):
+        """Update the bell and the agenda from a live store delta."""
+        self.set_has_notifications(delta.unread > 0)
+        self.refresh_agenda()
+
+    def _on_reminders_due(self, records):
+        """Light the bell without waiting for the unread flags to be written."""
+        self.set_has_notifications(True)
+        # An appointment is starting, so "Now" and "Next" have changed
+        self._update_agenda()
+
+    def _on_clients_merged(self):
+        """Clients came in from elsewhere (e.g. sync); called on the merging thread."""
+        Clock.schedule_once(lambda dt: self.client_search.refresh())
 
     def set_has_notifications(self, has_notifications):
         """Set whether there are notifications and update the icon."""
-        print(f"Setting notification status to: {'Has notifications' if has_notifications else 'No notifications'}")
+        log.debug("Setting notification status to: %s", 'Has notifications' if has_notifications else 'No notifications')
         self.has_notifications = has_notifications
+        # Icons come from the shared cache, so toggling never touches the disk
         if has_notifications:
-            self.notification_icon.source = './images/notificationRed.png'
+            self.notification_icon.texture = get_icon('notificationRed', fallback='notification')
         else:
-            self.notification_icon.source = './images/notification.png'
+            self.notification_icon.texture = get_icon('notification')
 
 
 def setup_screen_manager():
     """Setup screen manager with all required screens."""
-    sm = ScreenManager()
-
-    # Create screens
-    home_screen = HomePanel(name='home')
-    notifications_screen = NotificationsPanel(name='notifications')
+    sm = LazyScreenManager()
 
-    # Add screens to manager
-    sm.add_widget(home_screen)
-    sm.add_widget(notifications_screen)
+    # Home is shown first, the other screens are imported and built on first navigation
+    sm.add_widget(HomePanel(name='home'))
+    sm.register('notifications', 'panels.notifications_panel:NotificationsPanel')
 
     # Verify screens are properly registered
-    print(f"Available screens: {sm.screen_names}")
+    log.debug("Available screens: %s", sm.screen_names)
 
     return sm
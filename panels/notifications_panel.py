@@ -0,0 +1,696 @@
+from datetime import date
+
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.image import Image
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.screenmanager import Screen
+from kivy.uix.spinner import Spinner
+from kivy.uix.textinput import TextInput
+from kivy.utils import get_color_from_hex
+
+from panels.home_panel import MenuButton
+from services.background import BackgroundTask, BatchFeeder
+from services.instrumentation import timed
+from services.live_updates import get_live_notifications
+from services.log import get_logger
+from services.notification_pages import DEFAULT_PAGE_SIZE, NotificationPages
+from services.notification_query import DURATION_RANGES, TIME_WINDOWS, list_filters
+from services.notification_store import SAMPLE_NOTIFICATIONS, assign_ids, get_store
+from services.reminders import get_reminders
+from widgets.background import BackgroundBehavior, CardBehavior, ColoredBoxLayout, ColoredScrollView
+from widgets.icon_cache import get_icon
+from widgets.notification_item import DUE_COLOR, TIME_COLOR, CompactNotificationItem
+from widgets.text_cache import CachedLabel
+
+log = get_logger(__name__)
+
+# Returned by the loader when the store hasn't changed since the list was last shown
+UNCHANGED = object()
+
+# Wait this long after the last keystroke in the filter field before filtering
+FILTER_DELAY = 0.3
+
+# Height of the day section headers
+HEADER_HEIGHT = dp(30)
+
+# Fetch the next page once the end of the list is this close below the visible part
+PREFETCH_DISTANCE = dp(400)
+
+
+def _normalise(notification):
+    """Return the fields the list displays, as a new dict."""
+    return {
+            'id': notification['id'],
+            'time': notification.get('time', ''),
+            'title': notification.get('title', ''),
+            'duration': notification.get('duration', None),
+            'date': notification.get('date', None),
+            'due': notification['id'] in get_reminders().due_ids
+    }
+
+
+def _section_row(section):
+    """Return the list row of a day section header."""
+    return {'id': 'section:' + section, 'viewclass': 'SectionHeader', 'text': section, 'height': HEADER_HEIGHT}
+
+
+class SectionHeader(RecycleDataViewBehavior, Label):
+    """Day heading ("Today", "Tomorrow", ...) between the notifications."""
+
+    def __init__(self, **kwargs):
+        super(SectionHeader, self).__init__(
+                font_size=dp(16),
+                bold=True,
+                color=get_color_from_hex("#19081c"),
+                halign='left',
+                valign='middle',
+                size_hint_y=None,
+                height=HEADER_HEIGHT,
+                **kwargs
+        )
+        self.bind(size=self.setter('text_size'))
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Show the section at `index` in this (possibly reused) row."""
+        self.text = data.get('text', '')
+
+
+class NotificationItem(CardBehavior, BoxLayout):
+    @timed('NotificationItem.__init__')
+    def __init__(self, time, title, duration=None, due=False, **kwargs):
+        # White rounded background with a light gray shadow (CardBehavior defaults)
+        super(NotificationItem, self).__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.size_hint_y = None
+        self.height = dp(100)
+        self.padding = [dp(15), dp(10)]
+        self.spacing = dp(5)
+
+        # Texts come from the shared texture cache, so repeated times, titles and durations render once.
+        # Each label shows its texture centered in its box, so no text_size is needed.
+
+        # Create horizontal layout for time and title
+        time_title_layout = BoxLayout(size_hint_y=None, height=dp(40))
+
+        # Time label
+        self.time_label = CachedLabel(
+                text=time,
+                font_size=dp(16),
+                color=DUE_COLOR if due else TIME_COLOR,
+                size_hint_x=None,
+                width=dp(100),
+                halign='left',
+                valign='middle'
+        )
+
+        # Title label
+        self.title_label = CachedLabel(
+                text=title,
+                font_size=dp(16),
+                bold=True,
+                color=get_color_from_hex("#333333"),
+                halign='left',
+                valign='middle'
+        )
+
+        # Add time and title to horizontal layout
+        time_title_layout.add_widget(self.time_label)
+        time_title_layout.add_widget(self.title_label)
+
+        # Duration layout, only attached to the item when a duration is provided
+        self.duration_layout = BoxLayout(size_hint_y=None, height=dp(30))
+        self.duration_label = CachedLabel(
+                text=duration or '',
+                font_size=dp(14),
+                color=get_color_from_hex("#999999"),
+                size_hint_x=None,
+                width=dp(100),
+                halign='left',
+                valign='middle'
+        )
+
+        # Add clock icon
+        clock_icon = Image(
+                texture=get_icon('clock'),
+                size_hint=(None, None),
+                size=(dp(16), dp(16))
+        )
+
+        self.duration_layout.add_widget(clock_icon)
+        self.duration_layout.add_widget(self.duration_label)
+
+        # Notification bell
+        bell_icon = Image(
+                texture=get_icon('notification'),
+                size_hint=(None, None),
+                size=(dp(24), dp(24)),
+                pos_hint={'right': 1}
+        )
+
+        # Add widgets to main layout
+        self.add_widget(time_title_layout)
+        if duration:
+            self.add_widget(self.duration_layout)
+
+        # Add bell icon
+        self.bell_layout = BoxLayout(size_hint_y=None, height=dp(24))
+        self.bell_layout.add_widget(Label())  # Spacer
+        self.bell_layout.add_widget(bell_icon)
+        self.add_widget(self.bell_layout)
+
+    def set_content(self, time, title, duration=None, due=False):
+        """Update the displayed notification without rebuilding the widgets."""
+        self.time_label.text = time
+        self.time_label.color = DUE_COLOR if due else TIME_COLOR
+        self.title_label.text = title
+        self.duration_label.text = duration or ''
+
+        # Attach or detach the duration row depending on the new content
+        if duration and self.duration_layout.parent is None:
+            self.add_widget(self.duration_layout, index=1)  # Between time/title and bell
+        elif not duration and self.duration_layout.parent is not None:
+            self.remove_widget(self.duration_layout)
+
+
+class NotificationRow(RecycleDataViewBehavior, NotificationItem):
+    """Recyclable notification item, populated from a plain dict by a RecycleView."""
+
+    def __init__(self, **kwargs):
+        super(NotificationRow, self).__init__(time='', title='', **kwargs)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Show the notification at `index` in this (possibly reused) row."""
+        self.set_content(
+                time=data.get('time', ''),
+                title=data.get('title', ''),
+                duration=data.get('duration', None),
+                due=data.get('due', False)
+        )
+
+
+class NotificationsList(BackgroundBehavior, RecycleView):
+    """Virtualized notification list that only builds widgets for visible rows."""
+
+    def __init__(self, viewclass=NotificationRow, **kwargs):
+        super(NotificationsList, self).__init__(do_scroll_x=False, **kwargs)
+
+        # Rows have a fixed height, so the layout never has to measure them
+        layout_manager = RecycleBoxLayout(
+                orientation='vertical',
+                padding=[dp(15), dp(15)],
+                spacing=dp(15),
+                default_size=(None, dp(100)),
+                default_size_hint=(1, None),
+                size_hint_y=None,
+                # Section headers name their own view class and height
+                key_viewclass='viewclass'
+        )
+        layout_manager.bind(minimum_height=layout_manager.setter('height'))
+        self.add_widget(layout_manager)
+        # Set after the layout manager exists: the view class is handed on to it
+        self.viewclass = viewclass
+
+
+class NotificationsPanel(Screen):
+    def __init__(self, **kwargs):
+        # Virtualized mode only builds widgets for visible rows (RecycleView)
+        self.virtualized = kwargs.pop('virtualized', True)
+        # Item widget: the canvas-drawn item by default, NotificationItem for the widget tree version
+        self.item_class = kwargs.pop('item_class', CompactNotificationItem)
+        # Notifications read from the store per page of the list, and how close to its end the next page is read
+        self.rows_per_page = kwargs.pop('rows_per_page', DEFAULT_PAGE_SIZE)
+        self.prefetch_distance = kwargs.pop('prefetch_distance', PREFETCH_DISTANCE)
+        super(NotificationsPanel, self).__init__(**kwargs)
+
+        # Main layout
+        self.layout = BoxLayout(orientation='vertical')
+
+        # Top ribbon with back button and panel name, on a light gray background
+        self.top_ribbon = ColoredBoxLayout(
+                fill_color=get_color_from_hex("#F6F6F6"),
+                size_hint=(1, None),
+                height=dp(60),
+                padding=[dp(15), dp(10)],
+                spacing=dp(10)
+        )
+
+        # Back button with arrow icon
+        self.back_button = MenuButton(
+                texture=get_icon('leftArrow'),
+                size_hint=(None, None),
+                size=(dp(33), dp(33))
+        )
+        self.back_button.bind(on_release=self.go_back_to_home)
+
+        # Panel name label
+        self.panel_label = Label(
+                text="Notifications",
+                font_size=dp(20),
+                bold=True,
+                color=get_color_from_hex("#19081c")
+        )
+
+        # Add back button and title to top ribbon
+        self.top_ribbon.add_widget(self.back_button)
+        self.top_ribbon.add_widget(self.panel_label)
+        # Add empty widget to balance layout
+        empty_widget = BoxLayout(size_hint=(None, None), size=(dp(33), dp(33)))
+        self.top_ribbon.add_widget(empty_widget)
+
+        # Add top ribbon to main layout
+        self.layout.add_widget(self.top_ribbon)
+
+        # Filter bar: title text, time of day and duration
+        self.filter_bar = ColoredBoxLayout(
+                fill_color=get_color_from_hex("#F6F6F6"),
+                size_hint=(1, None),
+                height=dp(45),
+                padding=[dp(15), dp(5)],
+                spacing=dp(10)
+        )
+        self.title_filter = TextInput(hint_text="Filter by title", multiline=False, font_size=dp(14))
+        self._filter_trigger = Clock.create_trigger(self._on_filter_changed, FILTER_DELAY)
+        self.title_filter.bind(text=lambda instance, value: self._filter_trigger())
+        self.time_filter = Spinner(text='Any time', values=list(TIME_WINDOWS), size_hint_x=0.5, font_size=dp(14))
+        self.time_filter.bind(text=self._on_filter_changed)
+        self.duration_filter = Spinner(text='Any length', values=list(DURATION_RANGES), size_hint_x=0.5, font_size=dp(14))
+        self.duration_filter.bind(text=self._on_filter_changed)
+        self.filter_bar.add_widget(self.title_filter)
+        self.filter_bar.add_widget(self.time_filter)
+        self.filter_bar.add_widget(self.duration_filter)
+        self.layout.add_widget(self.filter_bar)
+
+        # Content area with notifications, on a light gray background
+        content_color = get_color_from_hex("#F0F0F0")
+        if self.virtualized:
+            viewclass = NotificationRow if self.item_class is NotificationItem else self.item_class
+            self.content_area = NotificationsList(viewclass=viewclass, fill_color=content_color)
+            self.notifications_container = None
+        else:
+            self.content_area = ColoredScrollView(do_scroll_x=False, fill_color=content_color)
+
+            # Container for notification items
+            self.notifications_container = BoxLayout(
+                    orientation='vertical',
+                    padding=[dp(15), dp(15)],
+                    spacing=dp(15),
+                    size_hint_y=None
+            )
+            # Bind height to children to ensure proper scrolling
+            self.notifications_container.bind(minimum_height=self.notifications_container.setter('height'))
+
+            # Add container to scroll view
+            self.content_area.add_widget(self.notifications_container)
+
+        # Fetch more rows as the list is scrolled towards its end, or when it doesn't fill the screen
+        self._prefetch_trigger = Clock.create_trigger(self._check_prefetch)
+        self.content_area.bind(scroll_y=lambda instance, value: self._prefetch_trigger())
+        self._list_content().bind(height=self._on_content_height)
+
+        # Add content area to main layout
+        self.layout.add_widget(self.content_area)
+
+        # Add main layout to screen
+        self.add_widget(self.layout)
+
+        # Loading placeholder, shown while notifications are read in the background
+        self.loading_label = Label(
+                text="Loading notifications...",
+                font_size=dp(14),
+                color=get_color_from_hex("#999999"),
+                size_hint_y=None,
+                height=dp(30)
+        )
+        self._load_task = None
+        self._feeder = None
+
+        # What is on screen: store version, (filters, day) it was read for, item widgets and
+        # records by notification id, and id order
+        self._shown_version = None
+        self._shown_query = None
+        self._items = {}
+        self._records = {}
+        self._shown_ids = []
+
+        # The filter bar's settings, as list_filters returns them
+        self.filters = list_filters()
+
+        # The list is read from the store a page at a time, and pages are cached by the query that read them
+        self._pages = NotificationPages(_normalise, _section_row, self.rows_per_page)
+        self._pages_shown = 0
+        # Last page on screen, which tells where the next one starts; None when the rows aren't from the store
+        self._last_page = None
+        # Worker task reading the next page
+        self._page_task = None
+        # Distance scrolled from the top when a page was added, kept while the list grows below it
+        self._top_offset = None
+
+        # Load notifications from JSON when panel is shown, stop loading when leaving it
+        self.bind(on_pre_enter=self.load_notifications)
+        self.bind(on_leave=self.cancel_loading)
+
+        # Patch the list while it is shown when the data file changes
+        get_live_notifications().subscribe(self._on_notifications_changed)
+
+        # Highlight appointments as their reminders fire
+        get_reminders().subscribe(self._on_reminders_due)
+
+    def go_back_to_home(self, instance):
+        """Go back to home screen."""
+        log.debug("Back button clicked - returning to home panel")
+        if self.manager:
+            # Check if 'home' screen exists in the screen manager
+            if 'home' in self.manager.screen_names:
+                self.manager.current = 'home'
+            else:
+                log.warning("'home' screen not found in screen manager")
+                # Fallback - try to find any available screen
+                if len(self.manager.screen_names) > 0 and self.manager.screen_names[0] != self.name:
+                    self.manager.current = self.manager.screen_names[0]
+                else:
+                    log.error("No alternative screens available")
+
+    @timed()
+    def load_notifications(self, *args):
+        """Refresh the store and read the pages on screen from it, on a worker thread."""
+        self._read_pages(refresh=True)
+
+    def _read_pages(self, refresh):
+        """Show the list for the current filters from the top, as many pages as are on screen.
+
+        Pages still cached for the version on screen are shown at once; the others are
+        read on a worker thread, after refreshing the store when `refresh` is set.
+        """
+        self.cancel_loading()
+        # Nothing from the store is on screen yet (or only the sample data), so check the file
+        refresh = refresh or self._shown_version is None
+        filters, today, count = self.filters, date.today(), max(1, self._pages_shown)
+        if not refresh:
+            pages = self._pages.cached_first(self._shown_version, filters, today, count)
+            if pages is not None:
+                self._show_pages(pages)
+                return
+        self._show_loading(True)
+        task = BackgroundTask(
+                lambda: self._read_notifications(filters, today, count, refresh, task.progress),
+                on_done=self._on_notifications_read,
+                on_error=self._on_notifications_error,
+                # Widget-tree items take many frames to build, so only the virtualized list previews
+                on_progress=self._on_first_chunk_read if self.virtualized and refresh else None
+        )
+        self._load_task = task.start()
+
+    def cancel_loading(self, *args):
+        """Stop any load in progress, e.g. when leaving the screen."""
+        if self._load_task is not None:
+            self._load_task.cancel()
+            self._load_task = None
+        if self._feeder is not None:
+            self._feeder.cancel()
+            self._feeder = None
+        self._cancel_page()
+        self._show_loading(False)
+
+    @timed()
+    def _read_notifications(self, filters, today, count, refresh=True, progress=None):
+        """Read the first `count` pages of the list from the store. Runs on a worker thread.
+
+        With `refresh`, the store is refreshed first, and the first chunk of a file being
+        parsed is handed to `progress` right away, so the top of the list can be shown
+        before the whole file is read.
+        """
+        store = get_store()
+        if refresh:
+            # Check if notifications.json exists
+            if not store.exists():
+                return None
+
+            previewed = False
+
+            def on_chunk(records):
+                nonlocal previewed
+                if progress is not None and not previewed:
+                    previewed = True
+                    progress(records)
+
+            # Only re-parsed when the file changed since the last load
+            store.refresh(on_chunk=on_chunk)
+            if store.version == self._shown_version and (filters, today) == self._shown_query:
+                # Already on screen - nothing to read, normalise or patch
+                return UNCHANGED
+
+        # Each page is one bounded store query, and they all come from one store version
+        return self._pages.read_first(store, filters, today, count)
+
+    def _on_first_chunk_read(self, notifications):
+        """Main thread: show the start of the file while the worker reads the rest."""
+        if self._shown_version is not None or self.content_area.data:
+            # A full list is already on screen; keep it until the new one is ready
+            return
+        self.display_notifications(notifications)
+        self._show_loading(True)
+
+    def _on_notifications_read(self, result):
+        """Main thread: display what the worker read."""
+        self._load_task = None
+        if result is UNCHANGED:
+            self._show_loading(False)
+        elif result is None:
+            # Fallback to sample data if JSON doesn't exist
+            self.load_sample_notifications()
+        else:
+            self._show_pages(result)
+
+    def _on_notifications_error(self, error):
+        """Main thread: the worker failed to read the notifications."""
+        self._load_task = None
+        log.warning("Error loading notifications: %s", error)
+        # Fallback to sample data
+        self.load_sample_notifications()
+
+    def _show_loading(self, loading):
+        """Show or hide the loading placeholder above the list."""
+        if loading and self.loading_label.parent is None:
+            self.layout.add_widget(self.loading_label, index=1)  # Just above the list
+        elif not loading and self.loading_label.parent is not None:
+            self.layout.remove_widget(self.loading_label)
+
+    @timed()
+    def display_notifications(self, notifications):
+        """Display a list of notification records (each with an 'id') through the filters, as one page.
+
+        The records don't come from the store, so no further pages are read.
+        """
+        self._cancel_page()
+        self._last_page = None
+        self._pages_shown = 0
+        self._shown_query = None
+        self._show_rows(self._pages.preview(notifications, self.filters, date.today()), None)
+
+    def _show_pages(self, pages):
+        """Show pages read from the store, from the first page of the list on."""
+        for page in pages:
+            self._pages.add(page)
+        self._cancel_page()
+        self._last_page = pages[-1]
+        self._pages_shown = len(pages)
+        self._shown_query = pages[0].key[1:3]
+        self._show_rows([row for page in pages for row in page.rows], pages[0].version)
+
+    def _show_rows(self, rows, version):
+        """Replace the rows on screen; existing item widgets are patched rather than rebuilt."""
+        if self._feeder is not None:
+            # Replaced mid-build: patch what was built so far instead
+            self._feeder.cancel()
+            self._feeder = None
+        if self.virtualized:
+            # The RecycleView only needs the plain dicts, rows are built lazily and reused
+            self.content_area.data = rows
+        elif self._items:
+            self._reconcile(rows)
+        else:
+            # First load: build the widgets a few at a time so every frame stays within budget
+            self._feeder = BatchFeeder(
+                    rows,
+                    self._add_notification_items,
+                    on_complete=lambda: self._on_items_added(version)
+            ).start()
+            return
+        self._shown_version = version
+        self._show_loading(False)
+        # The new rows may not fill the screen
+        self._prefetch_trigger()
+
+    def _list_content(self):
+        """Return the widget the content area scrolls."""
+        return self.content_area.layout_manager if self.virtualized else self.notifications_container
+
+    def _check_prefetch(self, *args):
+        """Read the next page once the end of the list is within prefetch_distance of the visible part."""
+        page = self._last_page
+        if (self._page_task is not None or self._load_task is not None or self._feeder is not None
+                or page is None or page.last):
+            return
+        # scroll_y is 1 at the top and 0 at the bottom of what can be scrolled
+        scrollable = max(0, self._list_content().height - self.content_area.height)
+        if self.content_area.scroll_y * scrollable > self.prefetch_distance:
+            return
+        self._page_task = self._pages.fetch(get_store(), page, self._on_page_fetched, self._on_page_error)
+
+    def _on_page_fetched(self, page):
+        """Main thread: add the page the worker read to the end of the list."""
+        self._page_task = None
+        if page.version != self._shown_version:
+            # The store changed since the list was read: read it again rather than mix versions
+            self.load_notifications()
+            return
+        self._last_page = page
+        if not page.rows:
+            # The list ended exactly on the previous page
+            return
+        # scroll_y is relative, so without this the view would move as the list grows
+        scrollable = max(0, self._list_content().height - self.content_area.height)
+        self._top_offset = (1 - self.content_area.scroll_y) * scrollable
+        self._pages_shown += 1
+        if self.virtualized:
+            self.content_area.data.extend(page.rows)
+        else:
+            self._add_notification_items(page.rows)
+
+    def _on_page_error(self, error):
+        """Main thread: reading the next page failed; the next scroll towards the end tries again."""
+        self._page_task = None
+        log.warning("Error reading the next page of notifications: %s", error)
+
+    def _on_content_height(self, instance, height):
+        """Keep the rows on screen in place when a page was added below them."""
+        offset = self._top_offset
+        if offset is not None:
+            self._top_offset = None
+            scrollable = height - self.content_area.height
+            if scrollable > 0:
+                self.content_area.scroll_y = max(0., 1. - offset / scrollable)
+        self._prefetch_trigger()
+
+    def _cancel_page(self):
+        """Drop the page being fetched, e.g. because the rows changed."""
+        if self._page_task is not None:
+            self._page_task.cancel()
+            self._page_task = None
+
+    def _on_filter_changed(self, *args):
+        """Apply the filter bar: show the first page for the new filters, from the cache or the store."""
+        self.filters = list_filters(
+                self.title_filter.text,
+                TIME_WINDOWS.get(self.time_filter.text),
+                DURATION_RANGES.get(self.duration_filter.text)
+        )
+        self._pages_shown = 0
+        self._read_pages(refresh=False)
+
+    def _create_item(self, notification):
+        """Create the item widget for `notification` (or section header row) and remember it by id."""
+        if 'viewclass' in notification:
+            item = SectionHeader(text=notification['text'])
+            self._items[notification['id']] = item
+            self._records[notification['id']] = notification
+            return item
+        item = self.item_class(
+                time=notification.get('time', ''),
+                title=notification.get('title', ''),
+                duration=notification.get('duration', None),
+                due=notification.get('due', False)
+        )
+        self._items[notification['id']] = item
+        self._records[notification['id']] = notification
+        return item
+
+    def _add_notification_items(self, notifications):
+        """Add one batch of NotificationItems to the end of the container."""
+        for notification in notifications:
+            self.notifications_container.add_widget(self._create_item(notification))
+            self._shown_ids.append(notification['id'])
+
+    def _on_items_added(self, version):
+        """All batches have been added."""
+        self._feeder = None
+        self._shown_version = version
+        self._show_loading(False)
+        self._prefetch_trigger()
+
+    def _reconcile(self, notifications):
+        """Update the container to show `notifications`, touching only what changed.
+
+        Removed ids lose their item, changed records are patched in place with
+        set_content(), new ids get a new item, and unchanged items are kept as they are.
+        """
+        container = self.notifications_container
+        wanted = {notification['id'] for notification in notifications}
+
+        # Removed
+        for notification_id in self._shown_ids:
+            if notification_id not in wanted:
+                container.remove_widget(self._items.pop(notification_id))
+                del self._records[notification_id]
+        shown = [notification_id for notification_id in self._shown_ids if notification_id in wanted]
+
+        for position, notification in enumerate(notifications):
+            notification_id = notification['id']
+            item = self._items.get(notification_id)
+
+            if item is None:
+                # Inserted
+                item = self._create_item(notification)
+            else:
+                # Changed
+                if self._records[notification_id] != notification:
+                    item.set_content(
+                            time=notification.get('time', ''),
+                            title=notification.get('title', ''),
+                            duration=notification.get('duration', None),
+                            due=notification.get('due', False)
+                    )
+                    self._records[notification_id] = notification
+                if position < len(shown) and shown[position] == notification_id:
+                    # Unchanged position
+                    continue
+                # Moved
+                container.remove_widget(item)
+                shown.remove(notification_id)
+
+            # children are in reverse order, so visual `position` is index len - position
+            container.add_widget(item, index=len(container.children) - position)
+            shown.insert(position, notification_id)
+
+        self._shown_ids = shown
+
+    def _on_notifications_changed(self, delta):
+        """Read the pages on screen again when the store changes while the list is shown."""
+        if self.manager is None or self.manager.current != self.name:
+            # Picked up by the version check on the next entry
+            return
+        if delta.version == self._shown_version:
+            return
+        # Only the pages on screen are read; rows that didn't change keep their views
+        self.load_notifications()
+
+    def _on_reminders_due(self, records):
+        """Highlight the rows of the appointments that are starting."""
+        # Cached pages were normalised with the old due flags
+        self._pages.clear()
+        if self._load_task is not None or self._feeder is not None:
+            # The rows being loaded are normalised with the new due flags
+            return
+        due_ids = {record['id'] for record in records}
+        shown = self._shown_ids if not self.virtualized else [row['id'] for row in self.content_area.data]
+        if any(notification_id in due_ids for notification_id in shown):
+            self._read_pages(refresh=False)
+
+    def load_sample_notifications(self):
+        """Load sample notifications for testing."""
+        self.display_notifications(assign_ids([dict(notification) for notification in SAMPLE_NOTIFICATIONS]))
@@ -0,0 +1,55 @@
+import importlib
+
+from kivy.clock import Clock
+from kivy.uix.screenmanager import ScreenManager
+
+from services.startup_profiler import section
+
+
+class LazyScreenManager(ScreenManager):
+    """ScreenManager that imports and builds registered screens on first use.
+
+    Screens are registered with a 'module:Class' path, so their modules are not
+    imported until the screen is first shown (or preloaded when the app is idle).
+    """
+
+    def __init__(self, **kwargs):
+        super(LazyScreenManager, self).__init__(**kwargs)
+        # Screen name -> 'module:Class' for screens not built yet
+        self._factories = {}
+
+    def register(self, name, target):
+        """Register screen `name`, built from `target` ('module:Class') on first use."""
+        self._factories[name] = target
+
+    def is_registered(self, name):
+        """Return True if `name` is built or can be built on demand."""
+        return self.has_screen(name) or name in self._factories
+
+    def ensure_screen(self, name):
+        """Return screen `name`, importing and building it if needed."""
+        if self.has_screen(name):
+            return self.get_screen(name)
+
+        module_name, class_name = self._factories.pop(name).split(':')
+        with section('import screen ' + name):
+            module = importlib.import_module(module_name)
+        with section('build screen ' + name):
+            screen = getattr(module, class_name)(name=name)
+        self.add_widget(screen)
+        return screen
+
+    def on_current(self, instance, value):
+        # Build the screen just before switching to it
+        if value in self._factories:
+            self.ensure_screen(value)
+        super(LazyScreenManager, self).on_current(instance, value)
+
+    def preload_when_idle(self, delay=2.0):
+        """Build the remaining screens in the background, one per frame, after `delay` seconds."""
+        def preload_next(dt):
+            if self._factories:
+                self.ensure_screen(next(iter(self._factories)))
+                Clock.schedule_once(preload_next)
+
+        Clock.schedule_once(preload_next, delay)
@@ -0,0 +1,103 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from kivy.clock import Clock
+
+# Shared worker pool for file I/O and parsing, created on first use
+_executor = None
+
+
+def get_executor():
+    """Return the process-wide worker pool."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='background')
+    return _executor
+
+
+class BackgroundTask(object):
+    """Run `work` on a worker thread and deliver its result to `on_done` on the main thread.
+
+    `work` may hand partial results to `on_progress` with `progress(value)`.
+    Once cancelled, neither `on_done`, `on_error` nor `on_progress` is called.
+    """
+
+    def __init__(self, work, on_done, on_error=None, on_progress=None):
+        self.work = work
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancelled = False
+
+    def start(self):
+        """Submit the work to the worker pool."""
+        get_executor().submit(self._run)
+        return self
+
+    def cancel(self):
+        """Drop the result of the task."""
+        self.cancelled = True
+
+    def progress(self, value):
+        """Deliver a partial result to `on_progress` on the main thread. Called from the worker thread."""
+        if self.on_progress is not None:
+            Clock.schedule_once(lambda dt: self._deliver(self.on_progress, value))
+
+    def _run(self):
+        """Runs on the worker thread."""
+        try:
+            result = self.work()
+        except Exception as e:
+            if self.on_error is not None:
+                Clock.schedule_once(lambda dt, error=e: self._deliver(self.on_error, error))
+            return
+        Clock.schedule_once(lambda dt: self._deliver(self.on_done, result))
+
+    def _deliver(self, callback, value):
+        """Runs on the main thread."""
+        if not self.cancelled:
+            callback(value)
+
+
+class BatchFeeder(object):
+    """Hand `items` to `consume` in small batches, spread over frames.
+
+    Each frame consumes batches until `budget` seconds have been spent, then yields
+    back to Kivy so the frame can be drawn.
+    """
+
+    def __init__(self, items, consume, on_complete=None, batch_size=10, budget=0.008):
+        self.items = items
+        self.consume = consume
+        self.on_complete = on_complete
+        self.batch_size = batch_size
+        self.budget = budget
+        self.index = 0
+        self._event = None
+
+    def start(self):
+        """Start feeding on the next frame."""
+        self._event = Clock.schedule_once(self._step)
+        return self
+
+    def cancel(self):
+        """Stop feeding; remaining items are dropped."""
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _step(self, dt):
+        deadline = time.perf_counter() + self.budget
+        while self.index < len(self.items):
+            batch = self.items[self.index:self.index + self.batch_size]
+            self.index += len(batch)
+            self.consume(batch)
+            if time.perf_counter() >= deadline:
+                break
+
+        if self.index < len(self.items):
+            self._event = Clock.schedule_once(self._step)
+        else:
+            self._event = None
+            if self.on_complete is not None:
+                self.on_complete()
@@ -0,0 +1,248 @@
+"""Client directory stored in SQLite, searchable by name, phone and notes.
+
+Searches use an FTS5 full-text index with prefix indexes, so "jo sm" finds
+"John Smith" without scanning the table. SQLite builds without FTS5 (some
+Android builds) fall back to LIKE on the same columns.
+"""
+import os
+import re
+import sqlite3
+import threading
+import uuid
+
+from services.log import get_logger
+
+log = get_logger(__name__)
+
+# Default location of the client database
+CLIENTS_PATH = './data/clients.db'
+
+# Results per page handed to the list
+PAGE_SIZE = 50
+
+# Sample clients used when the directory is empty; fixed uids, so synced devices share one copy
+SAMPLE_CLIENTS = [
+        {"uid": "sample-1", "name": "Alice Johnson", "phone": "555-0101", "notes": "Prefers morning appointments"},
+        {"uid": "sample-2", "name": "Brian Smith", "phone": "555-0102", "notes": "Follow-up in two weeks"},
+        {"uid": "sample-3", "name": "Carla Gomez", "phone": "555-0103", "notes": "Initial consultation done"},
+        {"uid": "sample-4", "name": "David Lee", "phone": "555-0104", "notes": ""}
+]
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+class ClientDirectory(object):
+    """Clients in a SQLite database, with an FTS5 index kept in sync by triggers."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS clients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL DEFAULT '',
+            phone TEXT NOT NULL DEFAULT '',
+            notes TEXT NOT NULL DEFAULT '',
+            uid TEXT
+        );
+        CREATE INDEX IF NOT EXISTS clients_by_name ON clients (name COLLATE NOCASE, id);
+    """
+
+    # Ids are local to the database; the uid identifies a client across synced devices
+    _UID_SCHEMA = """
+        UPDATE clients SET uid = lower(hex(randomblob(16))) WHERE uid IS NULL;
+        CREATE UNIQUE INDEX IF NOT EXISTS clients_by_uid ON clients (uid);
+    """
+
+    # External content table: the index stores no second copy of the text.
+    # prefix='1 2 3' adds prefix indexes, so short prefix queries don't walk the whole term list.
+    _FTS_SCHEMA = """
+        CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+            name, phone, notes, content='clients', content_rowid='id', prefix='1 2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS clients_fts_insert AFTER INSERT ON clients BEGIN
+            INSERT INTO clients_fts (rowid, name, phone, notes) VALUES (new.id, new.name, new.phone, new.notes);
+        END;
+        CREATE TRIGGER IF NOT EXISTS clients_fts_delete AFTER DELETE ON clients BEGIN
+            INSERT INTO clients_fts (clients_fts, rowid, name, phone, notes)
+            VALUES ('delete', old.id, old.name, old.phone, old.notes);
+        END;
+        CREATE TRIGGER IF NOT EXISTS clients_fts_update AFTER UPDATE ON clients BEGIN
+            INSERT INTO clients_fts (clients_fts, rowid, name, phone, notes)
+            VALUES ('delete', old.id, old.name, old.phone, old.notes);
+            INSERT INTO clients_fts (rowid, name, phone, notes) VALUES (new.id, new.name, new.phone, new.notes);
+        END;
+    """
+
+    _COLUMNS = 'id, name, phone, notes'
+
+    def __init__(self, path=CLIENTS_PATH):
+        self.path = path
+        # None until connected, then whether the FTS5 index is available
+        self.full_text = None
+        self._connection = None
+        # Searches run on worker threads, edits on the main thread
+        self._lock = threading.Lock()
+        # New clients are also queued here for the sync engine, when one runs
+        self.outbox = None
+        # Called after clients were merged from elsewhere, on the merging thread
+        self._listeners = []
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(self._SCHEMA)
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(clients)')]
+            if 'uid' not in columns:
+                # Databases created before clients were synced
+                self._connection.execute('ALTER TABLE clients ADD COLUMN uid TEXT')
+            self._connection.executescript(self._UID_SCHEMA)
+            indexed = self._connection.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clients_fts'"
+            ).fetchall()
+            try:
+                self._connection.executescript(self._FTS_SCHEMA)
+                self.full_text = True
+                if not indexed:
+                    # The triggers only index rows written from now on; index the clients
+                    # already there (a database from before FTS5, or from a build without it)
+                    with self._connection:
+                        self._connection.execute("INSERT INTO clients_fts (clients_fts) VALUES ('rebuild')")
+            except sqlite3.OperationalError as e:
+                log.info("FTS5 unavailable (%s), client search falls back to LIKE", e)
+                self.full_text = False
+        return self._connection
+
+    def add_listener(self, listener):
+        """Call `listener()` whenever merge() has changed the clients."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_client(row):
+        return {'id': row[0], 'name': row[1], 'phone': row[2], 'notes': row[3]}
+
+    def extend(self, clients):
+        """Add several clients in one transaction."""
+        clients = [dict(client, uid=client.get('uid') or uuid.uuid4().hex) for client in clients]
+        rows = [
+                (client.get('name', ''), client.get('phone', ''), client.get('notes', ''), client['uid'])
+                for client in clients
+        ]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany('INSERT INTO clients (name, phone, notes, uid) VALUES (?, ?, ?, ?)', rows)
+        if self.outbox is not None:
+            self.outbox.add_clients(clients)
+
+    def merge(self, clients, deleted_uids=()):
+        """Insert or update clients received from elsewhere (e.g. sync) by uid, and delete `deleted_uids`.
+
+        The changes are not queued for sync again.
+        """
+        rows = [
+                (client['uid'], client.get('name', ''), client.get('phone', ''), client.get('notes', ''))
+                for client in clients
+        ]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany('DELETE FROM clients WHERE uid = ?', [(uid,) for uid in deleted_uids])
+                # Unchanged rows are skipped, so the full-text index isn't rewritten for our own echoes
+                connection.executemany(
+                        'INSERT INTO clients (uid, name, phone, notes) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (uid) DO UPDATE SET name = excluded.name, phone = excluded.phone, '
+                        'notes = excluded.notes '
+                        'WHERE (name, phone, notes) IS NOT (excluded.name, excluded.phone, excluded.notes)',
+                        rows
+                )
+        # Outside the lock, so listeners may query the directory
+        for listener in list(self._listeners):
+            listener()
+
+    def all_clients(self):
+        """Return every client, with its uid."""
+        rows = self._query('SELECT %s, uid FROM clients ORDER BY id' % self._COLUMNS)
+        return [dict(self._to_client(row), uid=row[4]) for row in rows]
+
+    def add(self, name, phone='', notes=''):
+        """Add a single client."""
+        self.extend([{'name': name, 'phone': phone, 'notes': notes}])
+
+    def count(self):
+        """Return the number of clients."""
+        return self._query('SELECT COUNT(*) FROM clients')[0][0]
+
+    def search(self, query, offset=0, limit=PAGE_SIZE):
+        """Return up to `limit` clients matching every word of `query` as a prefix, from `offset`.
+
+        An empty query lists every client by name.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            rows = self._query(
+                    'SELECT %s FROM clients ORDER BY name COLLATE NOCASE, id LIMIT ? OFFSET ?' % self._COLUMNS,
+                    (limit, offset)
+            )
+        elif self._full_text_available():
+            # "jo sm" -> "jo"* "sm"*: every word must start a word in name, phone or notes.
+            # Results stream in rowid order; ordering by name would sort every match first.
+            match = ' '.join('"%s"*' % word for word in words)
+            rows = self._query(
+                    'SELECT %s FROM clients WHERE id IN '
+                    '(SELECT rowid FROM clients_fts WHERE clients_fts MATCH ? LIMIT ? OFFSET ?) '
+                    'ORDER BY id' % self._COLUMNS,
+                    (match, limit, offset)
+            )
+        else:
+            # Same rule as the index: each word must start a word. A space is put before
+            # the text and dashes count as spaces, so "% word%" also matches at the start
+            # and after a dash ("555-01"); "mar" finds "Mark" but not "Omar".
+            conditions = []
+            params = []
+            for word in words:
+                pattern = '% ' + word.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                conditions.append('(%s)' % ' OR '.join(
+                        "' ' || replace(%s, '-', ' ') LIKE ? ESCAPE '\\'" % column for column in ('name', 'phone', 'notes')
+                ))
+                params.extend((pattern, pattern, pattern))
+            rows = self._query(
+                    'SELECT %s FROM clients WHERE %s ORDER BY id LIMIT ? OFFSET ?' % (
+                            self._COLUMNS, ' AND '.join(conditions)
+                    ),
+                    params + [limit, offset]
+            )
+        return [self._to_client(row) for row in rows]
+
+    def _full_text_available(self):
+        if self.full_text is None:
+            with self._lock:
+                self._connect()
+        return self.full_text
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+# Shared directories, one per database file
+_directories = {}
+
+
+def get_directory(path=CLIENTS_PATH):
+    """Return the process-wide directory for `path`."""
+    directory = _directories.get(path)
+    if directory is None:
+        directory = _directories[path] = ClientDirectory(path)
+    return directory
@@ -0,0 +1,169 @@
+"""Watch a single file for changes.
+
+Uses inotify on Linux (Android included) and falls back to polling the file's
+mtime and size, backing off while nothing changes. `on_change` is always called
+on the kivy main thread.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+
+from kivy.clock import Clock
+
+from services.log import get_logger
+
+log = get_logger(__name__)
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct('iIII')
+
+
+def _load_libc():
+    """Return libc with the inotify functions, or None if unavailable."""
+    if not sys.platform.startswith('linux'):
+        return None
+    for name in (ctypes.util.find_library('c'), 'libc.so.6', 'libc.so', None):
+        try:
+            libc = ctypes.CDLL(name, use_errno=True)
+        except OSError:
+            continue
+        if hasattr(libc, 'inotify_init1'):
+            return libc
+    return None
+
+
+class InotifyWatcher(object):
+    """Block on inotify in a daemon thread; no work at all while the file is unchanged."""
+
+    # Changes in the directory that can affect the file, including atomic renames onto it
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, path, on_change, libc):
+        self.path = os.path.abspath(path)
+        self.on_change = on_change
+        self.libc = libc
+        self._fd = -1
+        self._wake_r, self._wake_w = -1, -1
+        self._thread = None
+        # Bursts of events (write, then close) produce a single callback per frame
+        self._trigger = Clock.create_trigger(lambda dt: self.on_change())
+
+    def start(self):
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        self._fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if self.libc.inotify_add_watch(self._fd, directory.encode(), self.MASK) < 0:
+            os.close(self._fd)
+            raise OSError(ctypes.get_errno(), 'inotify_add_watch failed')
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(target=self._run, name='file-watcher', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        os.write(self._wake_w, b'x')
+        self._thread.join()
+        self._thread = None
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            os.close(fd)
+
+    def poke(self):
+        """Nothing to catch up on: the thread keeps receiving events while the app is paused."""
+
+    def _run(self):
+        name = os.path.basename(self.path).encode()
+        while True:
+            readable = select.select([self._fd, self._wake_r], [], [])[0]
+            if self._wake_r in readable:
+                return
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            offset = 0
+            changed = False
+            while offset < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                event_name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                changed = changed or event_name == name
+            if changed:
+                self._trigger()
+
+
+class PollingWatcher(object):
+    """Check the file's mtime and size on the kivy Clock, backing off while it is unchanged."""
+
+    def __init__(self, path, on_change, min_interval=1.0, max_interval=30.0):
+        self.path = path
+        self.on_change = on_change
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self._signature = self._stat()
+        self._event = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        self._event = Clock.schedule_once(self._check, self.interval)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def poke(self):
+        """Check again soon, e.g. when the app comes back to the foreground."""
+        self.interval = self.min_interval
+        self.stop()
+        self._event = Clock.schedule_once(self._check, 0)
+
+    def _check(self, dt):
+        signature = self._stat()
+        if signature != self._signature:
+            self._signature = signature
+            self.interval = self.min_interval
+            self.on_change()
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+        self._event = Clock.schedule_once(self._check, self.interval)
+
+
+def watch_file(path, on_change):
+    """Start watching `path` with the best available watcher and return it."""
+    libc = _load_libc()
+    if libc is not None:
+        watcher = InotifyWatcher(path, on_change, libc)
+        try:
+            watcher.start()
+            return watcher
+        except OSError as e:
+            log.info("inotify unavailable (%s), polling %s instead", e, path)
+
+    watcher = PollingWatcher(path, on_change)
+    watcher.start()
+    return watcher
@@ -0,0 +1,145 @@
+"""Opt-in hot path and frame time instrumentation.
+
+Enabled with SCHEDULER_INSTRUMENT=1 (or python main.py --instrument). When disabled,
+`timed` returns the function untouched, so instrumented code costs nothing.
+"""
+import functools
+import json
+import os
+import time
+from collections import deque
+
+from kivy.clock import Clock
+
+ENABLED = os.environ.get('SCHEDULER_INSTRUMENT', '') not in ('', '0')
+
+# Frames longer than this count as jank (a dropped frame at 60 fps)
+JANK_THRESHOLD = 1 / 60. * 1.5
+
+# name -> [calls, total seconds, max seconds]
+_calls = {}
+_frames = None
+
+
+def enable():
+    """Turn instrumentation on; must run before the instrumented modules are imported."""
+    global ENABLED
+    ENABLED = True
+    os.environ['SCHEDULER_INSTRUMENT'] = '1'
+
+
+def record(name, seconds):
+    """Add one timing sample for `name`."""
+    entry = _calls.get(name)
+    if entry is None:
+        entry = _calls[name] = [0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += seconds
+    if seconds > entry[2]:
+        entry[2] = seconds
+
+
+def timed(name=None):
+    """Decorator timing every call of the function under `name` (default: its qualified name)."""
+    def decorator(function):
+        if not ENABLED:
+            return function
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class FrameRecorder(object):
+    """Record the duration of every frame from the kivy Clock."""
+
+    def __init__(self, capacity=10000):
+        self.durations = deque(maxlen=capacity)
+        self.jank = 0
+        self._event = None
+
+    def start(self):
+        # Interval 0 runs the callback once per frame, with the previous frame's duration
+        self._event = Clock.schedule_interval(self._on_frame, 0)
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def _on_frame(self, dt):
+        self.durations.append(dt)
+        if dt > JANK_THRESHOLD:
+            self.jank += 1
+
+
+def start_frame_recording():
+    """Start recording frame durations (once)."""
+    global _frames
+    if _frames is None:
+        _frames = FrameRecorder()
+        _frames.start()
+    return _frames
+
+
+def get_frame_recorder():
+    """Return the frame recorder, or None if not recording."""
+    return _frames
+
+
+def track_transitions(screen_manager):
+    """Time each screen transition, from the `current` change to the end of the animation."""
+    pending = {}
+
+    def on_current(manager, value):
+        pending['start'] = time.perf_counter()
+        pending['name'] = 'transition to ' + value
+
+    def on_complete(*args):
+        if 'start' in pending:
+            record(pending.pop('name'), time.perf_counter() - pending.pop('start'))
+
+    screen_manager.bind(current=on_current)
+    screen_manager.transition.bind(on_complete=on_complete)
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summary():
+    """Return frame time percentiles and per-function counts and totals, in milliseconds."""
+    durations = sorted(_frames.durations) if _frames is not None else []
+    return {
+            'frames': {
+                    'count': len(durations),
+                    'jank': _frames.jank if _frames is not None else 0,
+                    'p50_ms': _percentile(durations, 0.50) * 1000,
+                    'p95_ms': _percentile(durations, 0.95) * 1000,
+                    'p99_ms': _percentile(durations, 0.99) * 1000
+            },
+            'functions': {
+                    name: {'calls': calls, 'total_ms': total * 1000, 'max_ms': longest * 1000}
+                    for name, (calls, total, longest) in sorted(_calls.items())
+            }
+    }
+
+
+def export(path='./data/perf_summary.json'):
+    """Write the summary to `path` as JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(summary(), file, indent=2)
+    return path
@@ -0,0 +1,122 @@
+"""Incremental reader for large JSON array files.
+
+`json.load` reads the whole file into one string and returns nothing until every
+element is parsed, so a big notifications.json briefly needs several times its
+size in memory. These readers memory-map the file and decode it a window at a
+time: the C decoder parses each element from the window, and only the window and
+the elements not yet handed out are held at once.
+
+    for record in iter_array(path):
+        ...
+    for chunk in iter_chunks(path, 1000):
+        ...
+
+Malformed files raise ValueError (json.JSONDecodeError), like json.load.
+"""
+import codecs
+import json
+import mmap
+import re
+
+# Bytes mapped in and decoded per step; an element longer than this just takes a few steps
+WINDOW_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+# What may follow an element: the next comma or the closing bracket
+_DELIMITER = re.compile(r'[ \t\n\r]*([,\]])[ \t\n\r]*')
+
+_decoder = json.JSONDecoder()
+
+
+def _error(message, text, position):
+    return json.JSONDecodeError(message, text, position)
+
+
+def _windows(path, window):
+    """Yield the file's text `window` bytes at a time; multi-byte characters are never split."""
+    with open(path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return
+        with mapped:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            # A byte order mark at the start is allowed, as by json.load
+            start = 3 if mapped[:3] == codecs.BOM_UTF8 else 0
+            for offset in range(start, len(mapped), window):
+                yield decoder.decode(mapped[offset:offset + window])
+            decoder.decode(b'', final=True)
+
+
+def iter_array(path, window=WINDOW_SIZE):
+    """Yield the elements of the JSON array in the file at `path`, one at a time."""
+    windows = _windows(path, window)
+    text = ''
+    position = 0
+    exhausted = False
+
+    def more(text, position):
+        """Drop what was consumed and append the next window; return (text, position, exhausted)."""
+        chunk = next(windows, None)
+        if chunk is None:
+            return text, position, True
+        return text[position:] + chunk, 0, False
+
+    def skip_whitespace(text, position, exhausted):
+        while True:
+            while position < len(text) and text[position] in _WHITESPACE:
+                position += 1
+            if position < len(text) or exhausted:
+                return text, position, exhausted
+            text, position, exhausted = more(text, position)
+
+    text, position, exhausted = skip_whitespace(text, position, exhausted)
+    if position >= len(text) or text[position] != '[':
+        raise _error("Expecting '['", text, position)
+    text, position, exhausted = skip_whitespace(text, position + 1, exhausted)
+    if position < len(text) and text[position] == ']':
+        return
+
+    while True:
+        try:
+            element, end = _decoder.raw_decode(text, position)
+            delimiter = _DELIMITER.match(text, end)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            # The element runs past the window
+            text, position, exhausted = more(text, position)
+            continue
+        if delimiter is None:
+            if exhausted:
+                raise _error("Expecting ',' delimiter", text, end)
+            # Nothing after the element yet, or a number cut at the window edge ("12" of "125")
+            text, position, exhausted = more(text, position)
+            continue
+        yield element
+
+        position = delimiter.end()
+        if delimiter.group(1) == ']':
+            break
+        if position >= len(text):
+            # The whitespace before the next element may go on in the next window
+            text, position, exhausted = skip_whitespace(text, position, exhausted)
+
+    # Only whitespace may follow the array
+    text, position, exhausted = skip_whitespace(text, position, exhausted)
+    if position < len(text):
+        raise _error("Extra data", text, position)
+
+
+def iter_chunks(path, chunk_size, window=WINDOW_SIZE):
+    """Yield the elements of the JSON array in the file at `path` in lists of up to `chunk_size`."""
+    chunk = []
+    for element in iter_array(path, window):
+        chunk.append(element)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
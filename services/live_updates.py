@@ -0,0 +1,74 @@
+"""Push notification store changes to the UI as they happen.
+
+A file watcher refreshes the store on a worker thread when the data file changes,
+and subscribers receive the resulting NotificationDelta on the kivy main thread.
+"""
+from kivy.clock import Clock
+
+from services.background import BackgroundTask
+from services.file_watcher import watch_file
+from services.log import get_logger
+from services.notification_store import get_store
+
+log = get_logger(__name__)
+
+
+class LiveNotifications(object):
+    """Watches the store's file and forwards its deltas to subscribers on the main thread."""
+
+    def __init__(self, store):
+        self.store = store
+        self._subscribers = []
+        self._watcher = None
+        store.add_listener(self._on_store_changed)
+
+    def subscribe(self, callback):
+        """Call `callback(delta)` on the main thread after every change."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self):
+        if self._watcher is None:
+            self._watcher = watch_file(self.store.path, self._on_file_changed)
+
+    def stop(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def resume(self):
+        """Look for changes made while the app was paused, rather than at the watcher's next check."""
+        if self._watcher is not None:
+            self._watcher.poke()
+
+    def _on_file_changed(self):
+        # Parsing can be slow for big files, keep it off the main thread
+        BackgroundTask(
+                self.store.refresh,
+                on_done=lambda changed: None,
+                on_error=lambda error: log.warning("Error refreshing notifications: %s", error)
+        ).start()
+
+    def _on_store_changed(self, delta):
+        # Any refresh (ours or a panel's) ends up here, possibly on a worker thread
+        Clock.schedule_once(lambda dt: self._publish(delta))
+
+    def _publish(self, delta):
+        log.debug("Notifications changed: +%d -%d ~%d", len(delta.added), len(delta.removed), len(delta.changed))
+        for callback in list(self._subscribers):
+            callback(delta)
+
+
+# Shared instance for the default store
+_live = None
+
+
+def get_live_notifications():
+    """Return the process-wide live updates service."""
+    global _live
+    if _live is None:
+        _live = LiveNotifications(get_store())
+    return _live
@@ -0,0 +1,88 @@
+"""App logging: level-gated module loggers and an optional in-memory ring buffer.
+
+Use `log = get_logger(__name__)` at module level and pass arguments separately
+(`log.debug("Opening %s", name)`) so nothing is formatted when the level is off.
+Release builds log warnings and above only; set SCHEDULER_DEBUG=1 to see debug output.
+"""
+import logging
+import os
+import sys
+from collections import deque
+
+# Parent of every app logger, e.g. 'scheduler.panels.home_panel'
+ROOT_NAME = 'scheduler'
+
+_ring_buffer = None
+
+
+def get_logger(name):
+    """Return the logger for module `name`."""
+    return logging.getLogger(ROOT_NAME + '.' + name)
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep the last `capacity` records in memory, formatted only when dumped."""
+
+    def __init__(self, capacity=200):
+        super(RingBufferHandler, self).__init__()
+        self.records = deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump(self):
+        """Return the buffered records as formatted lines, oldest first."""
+        return [self.format(record) for record in list(self.records)]
+
+
+def configure(debug=None, ring_buffer=0, ring_level=logging.INFO):
+    """Set the app log level and optionally keep the last `ring_buffer` records for crash reports.
+
+    `debug` defaults to the SCHEDULER_DEBUG environment variable.
+    """
+    global _ring_buffer
+    if debug is None:
+        debug = os.environ.get('SCHEDULER_DEBUG', '') not in ('', '0')
+
+    level = logging.DEBUG if debug else logging.WARNING
+    root = logging.getLogger(ROOT_NAME)
+
+    if ring_buffer and _ring_buffer is None:
+        _ring_buffer = RingBufferHandler(ring_buffer)
+        _ring_buffer.setLevel(ring_level)
+        root.addHandler(_ring_buffer)
+        _install_excepthook()
+        # The buffer needs records at its own level even when the console doesn't
+        level = min(level, ring_level)
+
+    root.setLevel(level)
+
+
+def recent_events():
+    """Return the buffered log lines, or an empty list without a ring buffer."""
+    return _ring_buffer.dump() if _ring_buffer is not None else []
+
+
+def write_crash_report(path='./data/crash.log'):
+    """Write the buffered log lines to `path`."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w') as file:
+        file.write('\n'.join(recent_events()) + '\n')
+
+
+def _install_excepthook():
+    """Dump the ring buffer when an exception escapes the app."""
+    previous = sys.excepthook
+
+    def excepthook(exc_type, exc_value, traceback):
+        get_logger(__name__).critical("Unhandled exception", exc_info=(exc_type, exc_value, traceback))
+        try:
+            write_crash_report()
+        except OSError:
+            pass
+        previous(exc_type, exc_value, traceback)
+
+    sys.excepthook = excepthook
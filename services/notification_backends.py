@@ -0,0 +1,565 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import uuid
+
+from services.json_stream import iter_array, iter_chunks
+from services.notification_query import list_key
+from services.scheduler import duration_minutes
+from services.timeparse import parse_clock_time
+
+
+def _sort_minutes(time):
+    """Sort key stored alongside each row; unparseable times sort first."""
+    minutes = parse_clock_time(time)
+    return -1 if minutes is None else minutes
+
+
+def _sql_duration_minutes(duration):
+    """duration_minutes() of a duration column value, registered as an SQL function."""
+    return duration_minutes({'duration': duration})
+
+
+def normalize_id(notification_id):
+    """Return `notification_id` as a string, the one type ids have past the backends."""
+    return notification_id if isinstance(notification_id, str) else str(notification_id)
+
+
+def assign_ids(records, seen=None):
+    """Give every record a stable string 'id': its own if it has one, otherwise one derived from its content.
+
+    Derived ids stay the same across reloads as long as the record itself doesn't change;
+    identical records are told apart by their occurrence number. Ids of another type
+    (e.g. numbers in a hand-edited file) are converted with normalize_id, so sorting
+    by id never compares a number with a string. When records come in chunks, pass
+    the same `seen` dict for every chunk.
+    """
+    if seen is None:
+        seen = {}
+    for record in records:
+        key = '%s|%s|%s' % (record.get('time', ''), record.get('title', ''), record.get('duration', ''))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        if 'id' not in record:
+            record['id'] = key if occurrence == 0 else '%s#%d' % (key, occurrence)
+        elif not isinstance(record['id'], str):
+            record['id'] = str(record['id'])
+    return records
+
+
+def atomic_write(path, text):
+    """Replace the file at `path` with `text` so readers see either the old or the new file.
+
+    The data goes to a temporary file in the same directory, is fsynced, and is then
+    renamed over `path`. A crash mid-write leaves the previous file intact.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+    # Make the rename itself durable (not supported on every platform)
+    try:
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(directory_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_descriptor)
+
+
+class WriteBatch(object):
+    """A group of mutations written to a backend in one go."""
+
+    def __init__(self):
+        self.added = []
+        # id -> fields to change
+        self.updates = {}
+        self.deleted = set()
+        self.mark_all_read = False
+
+    def is_empty(self):
+        return not (self.added or self.updates or self.deleted or self.mark_all_read)
+
+
+def apply_batch(records, batch):
+    """Return a new list of record dicts with `batch` applied.
+
+    `records` may be dicts or Notification objects (which convert with dict()).
+    """
+    result = []
+    for record in records:
+        if record['id'] in batch.deleted:
+            continue
+        fields = batch.updates.get(record['id'])
+        if not isinstance(record, dict) or fields or (batch.mark_all_read and not record.get('read', False)):
+            record = dict(record)
+            if batch.mark_all_read:
+                record['read'] = True
+            if fields:
+                record.update(fields)
+        result.append(record)
+    result.extend(batch.added)
+    return result
+
+
+class NotificationBackend(object):
+    """Base class for notification storage backends.
+
+    File backends hold every record in memory once loaded (`indexed` is False).
+    Indexed backends answer counts and pages directly, without loading every row.
+    """
+
+    indexed = False
+
+    def __init__(self, path):
+        self.path = path
+
+    def exists(self):
+        """Return True if the backing file exists."""
+        return os.path.exists(self.path)
+
+    def signature(self):
+        """Return a cheap token that changes whenever the data changes, or None if missing."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def load(self):
+        """Return every record as a list of dicts."""
+        raise NotImplementedError
+
+    def iter_chunks(self, chunk_size):
+        """Yield every record, in lists of up to `chunk_size` dicts.
+
+        Formats that can be read incrementally yield the first chunk before the rest
+        is parsed; by default everything is loaded first.
+        """
+        records = self.load()
+        for start in range(0, len(records), chunk_size):
+            yield records[start:start + chunk_size]
+
+    def append(self, record):
+        """Add a single record."""
+        self.extend([record])
+
+    def extend(self, records):
+        """Add several records at once."""
+        raise NotImplementedError
+
+    def apply(self, batch, current=None):
+        """Write a WriteBatch. `current` is an up to date copy of the records, if the caller has one."""
+        raise NotImplementedError
+
+
+class JsonArrayBackend(NotificationBackend):
+    """The original format: a single JSON array, rewritten as a whole on every change.
+
+    Reads stream the memory-mapped file (see json_stream) instead of parsing one big string.
+    """
+
+    def load(self):
+        return list(iter_array(self.path))
+
+    def iter_chunks(self, chunk_size):
+        return iter_chunks(self.path, chunk_size)
+
+    def write_all(self, records):
+        """Atomically replace the file with `records`."""
+        atomic_write(self.path, json.dumps(records))
+
+    def extend(self, records):
+        existing = self.load() if self.exists() else []
+        existing.extend(records)
+        self.write_all(existing)
+
+    def apply(self, batch, current=None):
+        if current is None:
+            current = assign_ids(self.load()) if self.exists() else []
+        # The whole array is rewritten, so a batch costs one write however many mutations it holds
+        self.write_all(apply_batch(current, batch))
+
+
+class JsonLinesBackend(NotificationBackend):
+    """Append-only JSON Lines file, one record per line.
+
+    Mutations are appended as operation lines ({"op": "update" | "delete" | "mark_all_read"})
+    and replayed on load, so marking thousands of items read appends a single line.
+    The file is compacted once operation lines outnumber the records.
+    """
+
+    # Don't bother compacting small files
+    COMPACT_MIN_OPERATIONS = 1000
+
+    def __init__(self, path):
+        super(JsonLinesBackend, self).__init__(path)
+        self.operation_lines = 0
+
+    def load(self):
+        records = []
+        operations = 0
+        # Consecutive operation lines are replayed together
+        pending = WriteBatch()
+        with open(self.path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn last line from an interrupted append - ignore it
+                    continue
+
+                operation = entry.get('op')
+                if operation is None:
+                    if not pending.is_empty():
+                        records = apply_batch(assign_ids(records), pending)
+                        pending = WriteBatch()
+                    records.append(entry)
+                    continue
+
+                operations += 1
+                if operation == 'mark_all_read' and pending.updates:
+                    # Keep the order: earlier updates first, then mark everything read
+                    records = apply_batch(assign_ids(records), pending)
+                    pending = WriteBatch()
+                if operation == 'update':
+                    pending.updates.setdefault(normalize_id(entry['id']), {}).update(entry['fields'])
+                elif operation == 'delete':
+                    pending.deleted.add(normalize_id(entry['id']))
+                elif operation == 'mark_all_read':
+                    pending.mark_all_read = True
+
+        if not pending.is_empty():
+            records = apply_batch(assign_ids(records), pending)
+        self.operation_lines = operations
+        return records
+
+    def _append(self, entries):
+        with open(self.path, 'a') as file:
+            file.write(''.join(json.dumps(entry) + '\n' for entry in entries))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def extend(self, records):
+        self._append(records)
+
+    def apply(self, batch, current=None):
+        entries = []
+        for notification_id in batch.deleted:
+            entries.append({'op': 'delete', 'id': notification_id})
+        if batch.mark_all_read:
+            entries.append({'op': 'mark_all_read'})
+        for notification_id, fields in batch.updates.items():
+            entries.append({'op': 'update', 'id': notification_id, 'fields': fields})
+        self.operation_lines += len(entries)
+        entries.extend(batch.added)
+        self._append(entries)
+
+        if current is not None and self.operation_lines > max(self.COMPACT_MIN_OPERATIONS, len(current)):
+            self.compact(apply_batch(current, batch))
+
+    def compact(self, records):
+        """Atomically rewrite the file as plain records, dropping the operation lines."""
+        atomic_write(self.path, ''.join(json.dumps(record) + '\n' for record in records))
+        self.operation_lines = 0
+
+
+class SQLiteBackend(NotificationBackend):
+    """SQLite database with indexes on time and unread status.
+
+    Ids are kept as TEXT, so records keep the ids they had in the file they were
+    migrated from and those the sync server knows them by.
+    """
+
+    indexed = True
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS notifications (
+            id TEXT NOT NULL PRIMARY KEY,
+            time TEXT NOT NULL DEFAULT '',
+            title TEXT NOT NULL DEFAULT '',
+            duration TEXT,
+            read INTEGER NOT NULL DEFAULT 0,
+            minutes INTEGER NOT NULL DEFAULT -1,
+            date TEXT
+        );
+        CREATE INDEX IF NOT EXISTS notifications_by_time ON notifications (minutes, id);
+        CREATE INDEX IF NOT EXISTS notifications_unread ON notifications (read) WHERE read = 0;
+    """
+
+    _COLUMNS = 'id, time, title, duration, read, date'
+
+    _INSERT = (
+            'INSERT OR REPLACE INTO notifications (id, time, title, duration, read, minutes, date) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)'
+    )
+
+    # Ids per query when looking records up by id, under SQLite's limit on parameters
+    FIND_CHUNK = 500
+
+    def __init__(self, path):
+        super(SQLiteBackend, self).__init__(path)
+        self._connection = None
+        # The store may be queried from a worker thread as well as the main thread
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.executescript(self._SCHEMA)
+            columns = {row[1]: row[2] for row in self._connection.execute('PRAGMA table_info(notifications)')}
+            if 'date' not in columns:
+                # Databases created before appointments had a day
+                self._connection.execute('ALTER TABLE notifications ADD COLUMN date TEXT')
+            if columns['id'].upper() == 'INTEGER':
+                self._convert_ids()
+            # The list filters run in SQL with the same rules as in memory: SQLite's own
+            # lower() only folds ASCII, and durations are free text ("1h 30m")
+            self._connection.create_function('py_lower', 1, str.lower)
+            self._connection.create_function('duration_minutes', 1, _sql_duration_minutes)
+        return self._connection
+
+    def _convert_ids(self):
+        """Rebuild a table of databases created with INTEGER ids, keeping each id as its text."""
+        with self._connection:
+            self._connection.execute('ALTER TABLE notifications RENAME TO notifications_integer_ids')
+            # The indexes went with the renamed table; drop them so the schema recreates them
+            self._connection.execute('DROP INDEX IF EXISTS notifications_by_time')
+            self._connection.execute('DROP INDEX IF EXISTS notifications_unread')
+        self._connection.executescript(self._SCHEMA)
+        with self._connection:
+            self._connection.execute(
+                    'INSERT INTO notifications (id, time, title, duration, read, minutes, date) '
+                    'SELECT CAST(id AS TEXT), time, title, duration, read, minutes, date FROM notifications_integer_ids'
+            )
+            self._connection.execute('DROP TABLE notifications_integer_ids')
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self._connect().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _to_record(row):
+        return {
+                'id': row[0], 'time': row[1], 'title': row[2], 'duration': row[3], 'read': bool(row[4]), 'date': row[5]
+        }
+
+    def load(self):
+        rows = self._query('SELECT %s FROM notifications ORDER BY minutes, id' % self._COLUMNS)
+        return [self._to_record(row) for row in rows]
+
+    @staticmethod
+    def _to_row(record):
+        # Records without an id get a new one, as the writer gives new notifications
+        notification_id = record.get('id')
+        return (
+                uuid.uuid4().hex if notification_id is None else normalize_id(notification_id),
+                record.get('time', ''),
+                record.get('title', ''),
+                record.get('duration', None),
+                1 if record.get('read', False) else 0,
+                _sort_minutes(record.get('time', '')),
+                record.get('date', None)
+        )
+
+    def find(self, ids):
+        """Return {id: record} of the records with the given ids; unknown ids are left out."""
+        ids = [normalize_id(notification_id) for notification_id in ids]
+        found = {}
+        for start in range(0, len(ids), self.FIND_CHUNK):
+            chunk = ids[start:start + self.FIND_CHUNK]
+            rows = self._query(
+                    'SELECT %s FROM notifications WHERE id IN (%s)' % (self._COLUMNS, ', '.join('?' * len(chunk))),
+                    chunk
+            )
+            for row in rows:
+                found[row[0]] = self._to_record(row)
+        return found
+
+    def extend(self, records):
+        rows = [self._to_row(record) for record in records]
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(self._INSERT, rows)
+
+    def apply(self, batch, current=None):
+        rows = [self._to_row(record) for record in batch.added]
+        with self._lock:
+            connection = self._connect()
+            # One transaction for the whole batch
+            with connection:
+                if batch.deleted:
+                    connection.executemany(
+                            'DELETE FROM notifications WHERE id = ?',
+                            [(notification_id,) for notification_id in batch.deleted]
+                    )
+                if batch.mark_all_read:
+                    connection.execute('UPDATE notifications SET read = 1 WHERE read = 0')
+                for notification_id, fields in batch.updates.items():
+                    columns = [name for name in ('time', 'title', 'duration', 'read', 'date') if name in fields]
+                    if not columns:
+                        continue
+                    values = [int(fields[name]) if name == 'read' else fields[name] for name in columns]
+                    if 'time' in fields:
+                        columns.append('minutes')
+                        values.append(_sort_minutes(fields['time']))
+                    connection.execute(
+                            'UPDATE notifications SET %s WHERE id = ?' % ', '.join(name + ' = ?' for name in columns),
+                            values + [notification_id]
+                    )
+                if rows:
+                    connection.executemany(self._INSERT, rows)
+
+    def count(self):
+        """Return the number of notifications."""
+        return self._query('SELECT COUNT(*) FROM notifications')[0][0]
+
+    def unread_count(self):
+        """Return the number of unread notifications (served by the partial index)."""
+        return self._query('SELECT COUNT(*) FROM notifications WHERE read = 0')[0][0]
+
+    def page_after(self, cursor, limit, today=None):
+        """Keyset pagination: return `limit` records after `cursor`.
+
+        `cursor` is None for the first page, otherwise the value returned with the previous page.
+        With `today`, only today's records are returned: those dated `today` and those without a date.
+        Returns a (records, cursor) tuple.
+        """
+        conditions = []
+        params = []
+        if today is not None:
+            conditions.append("(date IS NULL OR date = '' OR date = ?)")
+            params.append(today.isoformat())
+        if cursor is not None:
+            # Row-value comparison walks the (minutes, id) index from the cursor onwards
+            conditions.append('(minutes, id) > (?, ?)')
+            params.extend(cursor)
+        rows = self._query(
+                'SELECT %s, minutes FROM notifications%s ORDER BY minutes, id LIMIT ?' % (
+                        self._COLUMNS, ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+                ),
+                params + [limit]
+        )
+        if not rows:
+            return [], cursor
+        last = rows[-1]
+        return [self._to_record(row) for row in rows], (last[6], last[0])
+
+    def list_page(self, filters, today, cursor, limit):
+        """Keyset pagination over the notification list: return `limit` records after `cursor`.
+
+        The list is the rows matching `filters` (see list_filters) in (day, minutes, id)
+        order, rows without a date being on `today`. Filtering, ordering and the limit
+        all run in SQL, so only the page's rows are read. The cursor is the last
+        record's list_key, None for the first page. Returns a (records, cursor) tuple.
+        """
+        title, window, duration_range = filters
+        day = "COALESCE(NULLIF(date, ''), ?)"
+        conditions = []
+        params = []
+        if title:
+            conditions.append('instr(py_lower(title), ?) > 0')
+            params.append(title)
+        if window is not None:
+            # Rows without a time (minutes -1) never fall in a window
+            conditions.append('minutes >= ? AND minutes < ?')
+            params.extend(window)
+        if duration_range is not None:
+            shortest, longest = duration_range
+            conditions.append('duration_minutes(duration) >= ?')
+            params.append(shortest)
+            if longest is not None:
+                conditions.append('duration_minutes(duration) < ?')
+                params.append(longest)
+        if cursor is not None:
+            conditions.append('(%s, minutes, id) > (?, ?, ?)' % day)
+            params.extend((today.isoformat(), cursor[0].isoformat(), cursor[1], cursor[2]))
+        rows = self._query(
+                'SELECT %s, %s AS day FROM notifications%s ORDER BY day, minutes, id LIMIT ?' % (
+                        self._COLUMNS, day, ' WHERE ' + ' AND '.join(conditions) if conditions else ''
+                ),
+                [today.isoformat()] + params + [limit]
+        )
+        if not rows:
+            return [], cursor
+        records = [self._to_record(row) for row in rows]
+        return records, list_key(records[-1], today)
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def open_backend(path):
+    """Pick a backend from the file extension of `path`."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.jsonl':
+        return JsonLinesBackend(path)
+    if extension in ('.db', '.sqlite', '.sqlite3'):
+        return SQLiteBackend(path)
+    return JsonArrayBackend(path)
+
+
+# Records read from the source and written per step when migrating
+MIGRATE_CHUNK = 10000
+
+
+def migrate_json(source_path, destination):
+    """Copy every record of a notifications.json array into `destination` (a backend or a path).
+
+    Records keep the ids the store gave them in the source file (see assign_ids), so
+    read state, queued sync operations and the server still refer to the same records.
+    """
+    if not isinstance(destination, NotificationBackend):
+        destination = open_backend(destination)
+
+    if isinstance(destination, JsonArrayBackend):
+        # Rewritten as a whole on every extend, so write it once
+        records = list(iter_array(source_path))
+        destination.extend(records)
+        return len(records)
+
+    # Streamed, so only one chunk of the source is in memory at a time
+    migrated = 0
+    seen = {}
+    for chunk in iter_chunks(source_path, MIGRATE_CHUNK):
+        destination.extend(assign_ids(chunk, seen))
+        migrated += len(chunk)
+    return migrated
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Migrate notifications.json to another backend.')
+    parser.add_argument('source', help='Path of the existing notifications.json')
+    parser.add_argument('destination', help='Target file (.jsonl or .db)')
+    arguments = parser.parse_args()
+
+    migrated = migrate_json(arguments.source, arguments.destination)
+    print(f"Migrated {migrated} notifications to {arguments.destination}")
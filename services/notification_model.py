@@ -0,0 +1,164 @@
+"""Compact in-memory notification records.
+
+`Notification` replaces the raw dicts from json.load: fixed __slots__ instead of a
+per-record dict, repeated strings (titles, times, durations) interned so equal
+values share one object, and the clock time parsed once into sortable minutes.
+`NotificationColumns` stores large feeds column by column and only materialises
+a `Notification` when an item is accessed.
+
+Both keep the small part of the dict interface the rest of the app relies on
+(`record['id']`, `record.get('time', '')`, `dict(record)`).
+"""
+import sys
+from array import array
+
+from services.timeparse import parse_clock_time
+
+# Feeds with more records than this are stored column by column
+COLUMNAR_THRESHOLD = 10000
+
+# Sort key for times that can't be parsed (they sort first)
+NO_TIME = -1
+
+_FIELDS = ('id', 'time', 'title', 'duration', 'read', 'date')
+
+
+# time string -> minutes; also shares one int object between records (only ints up to 256 are cached by Python)
+_minutes = {}
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def clock_minutes(time):
+    """Return the sort minutes for `time`, parsing each distinct string once."""
+    minutes = _minutes.get(time)
+    if minutes is None:
+        minutes = parse_clock_time(time)
+        minutes = NO_TIME if minutes is None else minutes
+        # There are only so many distinct clock times; don't let odd data grow this forever
+        if len(_minutes) < 10000:
+            _minutes[time] = minutes
+    return minutes
+
+
+class Notification(object):
+    """A single notification."""
+
+    __slots__ = ('id', 'time', 'title', 'duration', 'read', 'date', 'minutes')
+
+    def __init__(self, id, time='', title='', duration=None, read=False, date=None, minutes=None):
+        # Ids are unique, so interning them would only grow the intern table
+        self.id = id
+        self.time = _intern(time)
+        self.title = _intern(title)
+        self.duration = _intern(duration)
+        self.read = bool(read)
+        # Appointment day as 'YYYY-MM-DD'; None means today
+        self.date = _intern(date)
+        self.minutes = clock_minutes(self.time) if minutes is None else minutes
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(
+                record['id'],
+                record.get('time', ''),
+                record.get('title', ''),
+                record.get('duration', None),
+                record.get('read', False),
+                record.get('date', None)
+        )
+
+    def to_dict(self):
+        """Return the record in the notifications.json format."""
+        record = {'id': self.id, 'time': self.time, 'title': self.title}
+        if self.duration is not None:
+            record['duration'] = self.duration
+        if self.read:
+            record['read'] = True
+        if self.date is not None:
+            record['date'] = self.date
+        return record
+
+    # Mapping-style access, so code written for the raw dicts keeps working
+    def keys(self):
+        return self.to_dict().keys()
+
+    def __getitem__(self, key):
+        if key not in _FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in _FIELDS else None
+        return default if value is None else value
+
+    def __eq__(self, other):
+        if not isinstance(other, Notification):
+            return NotImplemented
+        return (self.id, self.time, self.title, self.duration, self.read, self.date) == \
+            (other.id, other.time, other.title, other.duration, other.read, other.date)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return 'Notification(%r, %r, %r, %r, read=%r, date=%r)' % (
+                self.id, self.time, self.title, self.duration, self.read, self.date
+        )
+
+
+class NotificationColumns(object):
+    """Sequence of notifications stored as parallel columns, read-only once filled.
+
+    Strings are interned, minutes live in an int array and read flags in a bytearray,
+    so a record costs a few pointers instead of a dict or an object.
+    """
+
+    def __init__(self, records=()):
+        self.ids = []
+        self.times = []
+        self.titles = []
+        self.durations = []
+        self.minutes = array('i')
+        self.read = bytearray()
+        self.dates = []
+        self.extend(records)
+
+    def extend(self, records):
+        """Append record dicts (with ids), e.g. one chunk at a time while a file is read."""
+        for record in records:
+            time = _intern(record.get('time', ''))
+            self.ids.append(record['id'])
+            self.times.append(time)
+            self.titles.append(_intern(record.get('title', '')))
+            self.durations.append(_intern(record.get('duration', None)))
+            self.minutes.append(clock_minutes(time))
+            self.read.append(1 if record.get('read', False) else 0)
+            self.dates.append(_intern(record.get('date', None)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _item(self, index):
+        return Notification(
+                self.ids[index], self.times[index], self.titles[index],
+                self.durations[index], self.read[index], self.dates[index], self.minutes[index]
+        )
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item(position) for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._item(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._item(index)
@@ -0,0 +1,154 @@
+"""The notification list, read from the store a page at a time.
+
+Every page is one bounded store query (NotificationStore.list_page): a keyset
+query for SQLite, a slice of the filtered records for file backends. The first
+page is read when the list is shown, the next ones on a worker thread as the list
+is scrolled towards its end, each starting at the cursor the previous one ended
+at. No more notifications than the pages on screen are ever read.
+
+Pages are kept in an LRU cache by the query that read them: (store version,
+filters, day, cursor). Showing the same filters again, e.g. after clearing the
+title filter, reuses the pages instead of querying the store again.
+"""
+from collections import OrderedDict
+
+from services.background import BackgroundTask
+from services.notification_query import NotificationQuery, record_date, section_of
+
+# Notifications per page; a phone screen shows about half of that
+DEFAULT_PAGE_SIZE = 20
+
+# Pages kept in the cache, across every query
+DEFAULT_CAPACITY = 64
+
+
+class NotificationPage(object):
+    """One page of the list: its rows, and the cursor the next page starts at."""
+
+    def __init__(self, key, rows, cursor, last):
+        # (store version, filters, today, cursor) of the query that read the page
+        self.key = key
+        self.version = key[0]
+        self.rows = rows
+        self.cursor = cursor
+        # True when the list ends on this page
+        self.last = last
+
+
+class NotificationPages(object):
+    """Pages of the notification list, read from a store and kept in an LRU cache.
+
+    A page's rows are `build_row(record)` for each of its notifications, with a
+    `header(section)` row in front of each day section.
+    """
+
+    def __init__(self, build_row, header, page_size=DEFAULT_PAGE_SIZE, capacity=DEFAULT_CAPACITY):
+        self.build_row = build_row
+        self.header = header
+        self.page_size = page_size
+        self.capacity = capacity
+        # key -> NotificationPage, least recently used first
+        self._pages = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cached(self, version, filters, today, cursor=None):
+        """Return the page after `cursor` as read at store `version`, if it is in the cache, otherwise None."""
+        key = (version, filters, today, cursor)
+        page = self._pages.get(key)
+        if page is not None:
+            self.hits += 1
+            self._pages.move_to_end(key)
+        return page
+
+    def cached_first(self, version, filters, today, count):
+        """Return the first `count` pages (fewer where the list ends) if they are all cached, otherwise None."""
+        pages = []
+        cursor = None
+        while len(pages) < count:
+            page = self.cached(version, filters, today, cursor)
+            if page is None:
+                return None
+            pages.append(page)
+            if page.last:
+                break
+            cursor = page.cursor
+        return pages
+
+    def read(self, store, filters, today, cursor=None):
+        """Query `store` for the page after `cursor`; safe on a worker thread, the page isn't cached."""
+        version, records, next_cursor = store.list_page(filters, today, cursor, self.page_size)
+        return NotificationPage(
+                (version, filters, today, cursor),
+                self._rows(records, today, cursor),
+                next_cursor,
+                len(records) < self.page_size
+        )
+
+    def read_first(self, store, filters, today, count):
+        """Query `store` for the first `count` pages, all at one store version. Runs on a worker thread."""
+        while True:
+            pages = [self.read(store, filters, today)]
+            while len(pages) < count and not pages[-1].last:
+                page = self.read(store, filters, today, pages[-1].cursor)
+                if page.version != pages[0].version:
+                    # The store changed between two pages: start again from the top
+                    break
+                pages.append(page)
+            else:
+                return pages
+
+    def add(self, page):
+        """Cache a page from read(); main thread only. Returns the page."""
+        if page.key not in self._pages:
+            self.misses += 1
+        self._pages[page.key] = page
+        self._pages.move_to_end(page.key)
+        if len(self._pages) > self.capacity:
+            self._pages.popitem(last=False)
+        return page
+
+    def fetch(self, store, page, on_done, on_error):
+        """Get the page after `page`, from the cache or from `store` on a worker thread.
+
+        `on_done(next_page)`, or `on_error(exception)` when the store query raised, is
+        called on the main thread. Returns the BackgroundTask
+        (cancel it to drop the page), or None when the page was cached and `on_done`
+        has already been called.
+        """
+        version, filters, today, _ = page.key
+        cached = self.cached(version, filters, today, page.cursor)
+        if cached is not None:
+            on_done(cached)
+            return None
+        cursor = page.cursor
+        return BackgroundTask(
+                lambda: self.read(store, filters, today, cursor),
+                on_done=lambda next_page: on_done(self.add(next_page)),
+                on_error=on_error
+        ).start()
+
+    def preview(self, records, filters, today):
+        """Return the rows of a first page made from `records` alone, e.g. the first chunk of a file being read."""
+        query = NotificationQuery()
+        query.set_records(records)
+        query.set_today(today)
+        query.set_filters(filters)
+        return self._rows(query.matches()[:self.page_size], today, None)
+
+    def clear(self):
+        """Drop every cached page, e.g. when what build_row returns has changed."""
+        self._pages.clear()
+
+    def _rows(self, records, today, cursor):
+        # The cursor is the previous page's last list key, so a section continued
+        # from the previous page doesn't get a second header
+        section = None if cursor is None else section_of(cursor[0], today)
+        rows = []
+        for record in records:
+            record_section = section_of(record_date(record, today), today)
+            if record_section != section:
+                section = record_section
+                rows.append(self.header(section))
+            rows.append(self.build_row(record))
+        return rows
@@ -0,0 +1,212 @@
+"""Filter and sort the notifications shown in the list, and name their day sections.
+
+`NotificationQuery` is a chain of memoized stages: sort, duration filter, time
+window filter, then title filter. Each stage keeps its last output together with
+the revision of its input and its own parameters, and only recomputes when one of
+them changed; nothing runs until the matches are asked for. Sorting comes first
+because no filter affects it, and the title filter comes last because it changes
+with every keystroke.
+"""
+from datetime import date, timedelta
+
+from services.notification_model import clock_minutes
+from services.scheduler import duration_minutes
+
+# Day sections, in display order
+EARLIER = 'Earlier'
+TODAY = 'Today'
+TOMORROW = 'Tomorrow'
+LATER = 'Later'
+
+# Time windows offered by the filter bar: name -> (start, end) in minutes since midnight
+TIME_WINDOWS = {
+        'Any time': None,
+        'Morning': (0, 12 * 60),
+        'Afternoon': (12 * 60, 17 * 60),
+        'Evening': (17 * 60, 24 * 60)
+}
+
+# Duration ranges offered by the filter bar: name -> (shortest, longest) in minutes, longest excluded
+DURATION_RANGES = {
+        'Any length': None,
+        'Under 1h': (0, 60),
+        '1h or more': (60, None)
+}
+
+# 'YYYY-MM-DD' -> date, or False when it doesn't parse; there are only a few distinct dates
+_dates = {}
+
+# title -> lower case title, for case-insensitive matching
+_folded = {}
+
+
+def record_date(record, today):
+    """Return the date of `record`: its 'date' field (YYYY-MM-DD), or `today` when it has none."""
+    return day_of(record.get('date'), today)
+
+
+def day_of(text, today):
+    """Return the date of a 'date' field value (YYYY-MM-DD), or `today` when it is empty or doesn't parse."""
+    if not text:
+        return today
+    day = _dates.get(text)
+    if day is None:
+        try:
+            day = date.fromisoformat(text)
+        except (TypeError, ValueError):
+            day = False
+        if len(_dates) < 10000:
+            _dates[text] = day
+    return day or today
+
+
+def list_key(record, today):
+    """Return the position of `record` in the list as (day, minutes, id); undated records are on `today`."""
+    return record_date(record, today), clock_minutes(record.get('time', '')), record['id']
+
+
+def list_position(records, cursor, today):
+    """Return the index of the first of `records` (in list order) after `cursor`, by bisection on list_key."""
+    low, high = 0, len(records)
+    while low < high:
+        middle = (low + high) // 2
+        if cursor < list_key(records[middle], today):
+            high = middle
+        else:
+            low = middle + 1
+    return low
+
+
+def list_filters(title='', window=None, duration=None):
+    """Return the list filters as a hashable (title, time window, duration range) tuple.
+
+    `window` and `duration` are values of TIME_WINDOWS and DURATION_RANGES; the
+    title is matched case-insensitively, so it is kept folded.
+    """
+    return title.strip().lower(), window, duration
+
+
+def _fold(title):
+    folded = _folded.get(title)
+    if folded is None:
+        folded = title.lower()
+        if len(_folded) < 10000:
+            _folded[title] = folded
+    return folded
+
+
+def section_of(day, today):
+    """Return the section name for an appointment on `day`."""
+    if day < today:
+        return EARLIER
+    if day == today:
+        return TODAY
+    if day == today + timedelta(days=1):
+        return TOMORROW
+    return LATER
+
+
+class _Stage(object):
+    """One memoized step: `compute(items, params)` runs again only when its input or params change.
+
+    `narrows(old, new)` tells whether every item matching `new` also matches `old`;
+    the previous output is then filtered instead of the whole input.
+    """
+
+    def __init__(self, upstream, compute, params=None, narrows=None):
+        self.upstream = upstream
+        self.compute = compute
+        self.params = params
+        self.narrows = narrows
+        # Bumped every time the output is recomputed
+        self.revision = 0
+        self._key = None
+        self._output = None
+
+    def output(self):
+        items = self.upstream.output()
+        key = (self.upstream.revision, self.params)
+        if key != self._key:
+            if (self.narrows is not None and self._key is not None and self._key[0] == key[0]
+                    and self.narrows(self._key[1], self.params)):
+                items = self._output
+            self._output = self.compute(items, self.params)
+            self._key = key
+            self.revision += 1
+        return self._output
+
+
+class _Source(object):
+    """Start of the pipeline: the records as they were handed in."""
+
+    def __init__(self):
+        self.records = []
+        self.revision = 0
+
+    def output(self):
+        return self.records
+
+
+class NotificationQuery(object):
+    """Filtered and sorted view of a list of notification records."""
+
+    def __init__(self):
+        self._source = _Source()
+        self._sorted = _Stage(self._source, self._sort, params=date.today())
+        self._by_duration = _Stage(self._sorted, self._filter_duration)
+        self._by_time = _Stage(self._by_duration, self._filter_time)
+        self._by_title = _Stage(self._by_time, self._filter_title, params='', narrows=self._title_narrows)
+
+    def set_records(self, records):
+        """Replace the records; every stage recomputes on the next matches()."""
+        self._source.records = records
+        self._source.revision += 1
+
+    def set_today(self, today):
+        """Set the date undated records are on, e.g. after midnight."""
+        self._sorted.params = today
+
+    def set_filters(self, filters):
+        """Apply a (title, time window, duration range) tuple from list_filters."""
+        self._by_title.params, self._by_time.params, self._by_duration.params = filters
+
+    def filters(self):
+        """Return the current filters, as list_filters does."""
+        return self._by_title.params, self._by_time.params, self._by_duration.params
+
+    def matches(self):
+        """Return the matching records, in time order, without headers."""
+        return self._by_title.output()
+
+    @staticmethod
+    def _sort(records, today):
+        # Records without a date are today's; records without a time come first in their day
+        return sorted(records, key=lambda record: list_key(record, today))
+
+    @staticmethod
+    def _filter_duration(records, duration_range):
+        if duration_range is None:
+            return records
+        shortest, longest = duration_range
+        if longest is None:
+            return [record for record in records if duration_minutes(record) >= shortest]
+        return [record for record in records if shortest <= duration_minutes(record) < longest]
+
+    @staticmethod
+    def _filter_time(records, window):
+        if window is None:
+            return records
+        # NO_TIME is negative, so records without a time never fall in a window
+        start, end = window
+        return [record for record in records if start <= clock_minutes(record.get('time', '')) < end]
+
+    @staticmethod
+    def _filter_title(records, text):
+        if not text:
+            return records
+        return [record for record in records if text in _fold(record.get('title', ''))]
+
+    @staticmethod
+    def _title_narrows(old, new):
+        # A title containing "meeti" also contains "meet"
+        return old in new
@@ -0,0 +1,269 @@
+import itertools
+import threading
+from datetime import date
+
+from services.notification_backends import assign_ids, open_backend
+from services.notification_model import COLUMNAR_THRESHOLD, NotificationColumns
+from services.notification_query import NotificationQuery, day_of, list_key, list_position
+from services.scheduler import Schedule
+
+# Default location of the notifications data file
+NOTIFICATIONS_PATH = './data/notifications.json'
+
+# Records parsed per step when loading a file backend
+LOAD_CHUNK = 1000
+
+# Rows read per query when building a day's schedule from an indexed backend
+SCHEDULE_CHUNK = 1000
+
+# Versions of every store come from this counter, so that versions of two stores
+# (e.g. one replacing the other for the same path) never compare equal
+_versions = itertools.count(1)
+
+# Sample notifications used when no data file is available
+SAMPLE_NOTIFICATIONS = [
+        {"time": "9:00 am", "title": "Client Meeting", "duration": "5h"},
+        {"time": "11:00 am", "title": "Team Standup", "duration": "5h"},
+        {"time": "3:00 pm", "title": "Design Conference", "duration": "11h"},
+        {"time": "4:30 pm", "title": "Project Deadline", "duration": "11h"}
+]
+
+
+class NotificationDelta(object):
+    """What changed in the store between `previous_version` and `version`.
+
+    `added` and `changed` are lists of (index, record), with indexes into the new
+    schedule (time order); `removed` is a list of ids. When `complete` is False (indexed backends,
+    or records that changed order) only the counts are known and listeners should reload.
+    """
+
+    def __init__(self, previous_version, version, count, unread, added=(), removed=(), changed=(), complete=True):
+        self.previous_version = previous_version
+        self.version = version
+        self.count = count
+        self.unread = unread
+        self.added = list(added)
+        self.removed = list(removed)
+        self.changed = list(changed)
+        self.complete = complete
+
+
+def diff_records(old_records, new_records):
+    """Return (added, removed, changed, same_order) between two id-keyed record lists."""
+    old_by_id = {record['id']: record for record in old_records}
+    new_ids = {record['id'] for record in new_records}
+
+    removed = [record['id'] for record in old_records if record['id'] not in new_ids]
+    added = []
+    changed = []
+    for index, record in enumerate(new_records):
+        old = old_by_id.get(record['id'])
+        if old is None:
+            added.append((index, record))
+        elif old != record:
+            changed.append((index, record))
+
+    # Records present in both lists must keep their relative order for a patch to be enough
+    same_order = (
+            [record['id'] for record in old_records if record['id'] in new_ids] ==
+            [record['id'] for record in new_records if record['id'] in old_by_id]
+    )
+    return added, removed, changed, same_order
+
+
+class NotificationStore(object):
+    """Cached view of a notification backend, refreshed only when the data changes.
+
+    File backends are parsed once and kept in `records` as compact Notification
+    objects (see notification_model), in file order. Indexed backends (SQLite) are
+    never loaded as a whole - counts and pages are queried on demand. `list_page`
+    and `schedule` only read what they return from an indexed backend: a page of
+    the filtered list, or one day's appointments.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.path = backend.path
+        # Every record carries a stable 'id' (see assign_ids)
+        self.records = []
+        # Time-indexed view of the records, rebuilt with every version
+        self._schedule = Schedule()
+        # (version, day, Schedule) of the last day asked for
+        self._day_schedule = None
+        # The list's filtered and sorted view of the records (file backends)
+        self._query = NotificationQuery()
+        # Changes every time the data changes, so callers can skip redundant work
+        self.version = 0
+        self._signature = None
+        self._count = 0
+        self._unread = 0
+        # Refreshes may come from worker threads and the main thread
+        self._lock = threading.Lock()
+        # Called with a NotificationDelta after every change, on the thread that refreshed
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """Call `listener(delta)` whenever a refresh finds changed data."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def exists(self):
+        """Return True if the backing file exists."""
+        return self.backend.exists()
+
+    def refresh(self, on_chunk=None):
+        """Reload if the backend's signature (mtime and size) changed. Returns True if the data changed.
+
+        While a file backend is read, `on_chunk(records)` is called on this thread with
+        each chunk of record dicts (with ids, in file order) as soon as it is parsed.
+        """
+        with self._lock:
+            delta = self._refresh(on_chunk)
+        if delta is None:
+            return False
+        # Outside the lock, so listeners may query the store
+        for listener in list(self._listeners):
+            listener(delta)
+        return True
+
+    def _refresh(self, on_chunk):
+        signature = self.backend.signature()
+        if signature == self._signature:
+            return None
+
+        if signature is None:
+            # File went away - drop what we had
+            return self._replace([], None)
+        if self.backend.indexed:
+            self._signature = signature
+            self._count = self.backend.count()
+            self._unread = self.backend.unread_count()
+            previous, self.version = self.version, next(_versions)
+            return NotificationDelta(previous, self.version, self._count, self._unread, complete=False)
+        return self._replace(self._load(on_chunk), signature)
+
+    def _load(self, on_chunk):
+        """Read every record of a file backend into the compact model (see notification_model).
+
+        Records are converted a chunk at a time, so the parsed dicts of only one
+        chunk exist at once however big the file is.
+        """
+        columns = NotificationColumns()
+        seen = {}
+        for chunk in self.backend.iter_chunks(LOAD_CHUNK):
+            assign_ids(chunk, seen)
+            if on_chunk is not None:
+                on_chunk(chunk)
+            columns.extend(chunk)
+        if len(columns) > COLUMNAR_THRESHOLD:
+            return columns
+        return list(columns)
+
+    def _replace(self, records, signature):
+        """Swap in a new set of records (model objects), update the cached aggregates and return the delta."""
+        schedule = Schedule(records)
+        # Listeners show the schedule, so the delta's indexes refer to time order
+        added, removed, changed, same_order = diff_records(self._schedule, schedule)
+        self.records = records
+        self._schedule = schedule
+        self._query.set_records(records)
+        self._signature = signature
+        self._count = len(records)
+        self._unread = sum(1 for record in records if not record.get('read', False))
+        previous, self.version = self.version, next(_versions)
+        return NotificationDelta(
+                previous, self.version, self._count, self._unread,
+                added, removed, changed, complete=same_order
+        )
+
+    def count(self):
+        """Return the number of notifications."""
+        return self._count
+
+    def unread_count(self):
+        """Return the number of notifications not yet marked as read."""
+        return self._unread
+
+    def schedule(self, today=None):
+        """Return the Schedule of today's appointments: the records dated `today` and those without a date.
+
+        `today` defaults to the current date. Only that day's rows are read from an
+        indexed backend; file backends filter the loaded records. Cached until the
+        data or the day changes.
+        """
+        if today is None:
+            today = date.today()
+        with self._lock:
+            cached = self._day_schedule
+            if cached is not None and cached[0] == self.version and cached[1] == today:
+                return cached[2]
+            version = self.version
+            if not self.backend.indexed:
+                schedule = self._schedule
+                # Columnar records keep their dates in a column, so only the day's records are materialised
+                dates = getattr(self.records, 'dates', None)
+                if dates is None:
+                    dates = [record.get('date') for record in self.records]
+                on_day = [index for index, text in enumerate(dates) if day_of(text, today) == today]
+                # Usually no record has a date, so the whole schedule is today's
+                if len(on_day) != len(dates):
+                    schedule = Schedule([self.records[index] for index in on_day])
+                self._day_schedule = (version, today, schedule)
+                return schedule
+
+        records = []
+        cursor = None
+        while True:
+            page, cursor = self.backend.page_after(cursor, SCHEDULE_CHUNK, today=today)
+            if not page:
+                break
+            records.extend(page)
+        schedule = Schedule(records)
+
+        with self._lock:
+            # Don't cache a schedule that a concurrent refresh already made stale
+            if version == self.version:
+                self._day_schedule = (version, today, schedule)
+        return schedule
+
+    def list_page(self, filters, today, cursor, limit):
+        """Return (version, records, cursor): the next `limit` records of the notification list.
+
+        The list is the notifications matching `filters` (see list_filters) in
+        (day, time, id) order, those without a date being on `today`. `cursor` is None
+        for the first page, otherwise the cursor returned with the previous page. The
+        version and the records are read together under the lock, so the records are
+        those of that version.
+        """
+        with self._lock:
+            if self.backend.indexed:
+                records, cursor = self.backend.list_page(filters, today, cursor, limit)
+            else:
+                records, cursor = self._list_page(filters, today, cursor, limit)
+            return self.version, records, cursor
+
+    def _list_page(self, filters, today, cursor, limit):
+        """Cut a page from the memoized query over the loaded records; the cursor is found with a bisect."""
+        self._query.set_today(today)
+        self._query.set_filters(filters)
+        matches = self._query.matches()
+        start = 0 if cursor is None else list_position(matches, cursor, today)
+        records = matches[start:start + limit]
+        if not records:
+            return [], cursor
+        return records, list_key(records[-1], today)
+
+
+# Shared stores, one per data file
+_stores = {}
+
+
+def get_store(path=NOTIFICATIONS_PATH):
+    """Return the process-wide store for `path`; the backend is picked from the file extension."""
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = NotificationStore(open_backend(path))
+    return store
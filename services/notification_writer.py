@@ -0,0 +1,157 @@
+"""Debounced, batched writes of notification changes.
+
+Mutations are collected in memory and written together once no new mutation has
+arrived for `delay` seconds, on a worker thread, using the backend's atomic or
+append-only write path. The store is refreshed afterwards, so live update
+subscribers see the change.
+"""
+import threading
+import uuid
+
+from kivy.clock import Clock
+
+from services.background import BackgroundTask
+from services.log import get_logger
+from services.notification_backends import WriteBatch
+from services.notification_store import get_store
+
+log = get_logger(__name__)
+
+
+class NotificationWriter(object):
+    """Coalesces mark-read, dismiss and add into one write per quiet period."""
+
+    def __init__(self, store, delay=0.5):
+        self.store = store
+        self.delay = delay
+        self._batch = WriteBatch()
+        self._event = None
+        # Only one batch is written at a time
+        self._write_lock = threading.Lock()
+        # Written batches are also queued here for the sync engine, when one runs
+        self.outbox = None
+
+    def add(self, record):
+        """Queue a new notification; returns its id."""
+        record = dict(record)
+        record.setdefault('id', uuid.uuid4().hex)
+        if self._batch.mark_all_read:
+            record['read'] = True
+        self._batch.added.append(record)
+        self._schedule()
+        return record['id']
+
+    def mark_read(self, notification_id, read=True):
+        """Queue marking one notification as read (or unread)."""
+        if not self._update_added(notification_id, {'read': read}):
+            self._batch.updates.setdefault(notification_id, {})['read'] = read
+        self._schedule()
+
+    def mark_all_read(self):
+        """Queue marking every notification as read; a single operation whatever the count."""
+        self._batch.mark_all_read = True
+        # Per-item read flags are superseded
+        for fields in self._batch.updates.values():
+            fields.pop('read', None)
+        for record in self._batch.added:
+            record['read'] = True
+        self._schedule()
+
+    def dismiss(self, notification_id):
+        """Queue removing a notification."""
+        added = [record for record in self._batch.added if record['id'] != notification_id]
+        if len(added) != len(self._batch.added):
+            # Never written - just forget it
+            self._batch.added = added
+        else:
+            self._batch.deleted.add(notification_id)
+            self._batch.updates.pop(notification_id, None)
+        self._schedule()
+
+    def _update_added(self, notification_id, fields):
+        for record in self._batch.added:
+            if record['id'] == notification_id:
+                record.update(fields)
+                return True
+        return False
+
+    def _schedule(self):
+        # Debounce: every mutation pushes the write back by `delay`
+        if self._event is not None:
+            self._event.cancel()
+        self._event = Clock.schedule_once(lambda dt: self.flush_async(), self.delay)
+
+    def _take_batch(self):
+        batch, self._batch = self._batch, WriteBatch()
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        return batch
+
+    def flush_async(self):
+        """Write the pending batch on a worker thread."""
+        batch = self._take_batch()
+        if batch.is_empty():
+            return
+        BackgroundTask(
+                lambda: self._write(batch),
+                on_done=lambda result: None,
+                on_error=lambda error: log.error("Error writing notifications: %s", error)
+        ).start()
+
+    def flush(self):
+        """Write the pending batch now, on the calling thread (e.g. when the app stops)."""
+        batch = self._take_batch()
+        if not batch.is_empty():
+            self._write(batch)
+
+    def _write(self, batch):
+        with self._write_lock:
+            # File backends apply the batch to the records already in memory instead of re-reading
+            self.store.refresh()
+            current = None if self.store.backend.indexed else self.store.records
+            self.store.backend.apply(batch, current)
+            self.store.refresh()
+        if self.outbox is not None:
+            self.outbox.add_batch(batch)
+
+    def merge(self, records, deleted=()):
+        """Write records received from elsewhere (e.g. sync) in one batch: known ids are updated, others added.
+
+        Runs on the calling thread; the changes are not queued for sync again.
+        """
+        with self._write_lock:
+            self.store.refresh()
+            if self.store.backend.indexed:
+                # Only the records concerned are read from an indexed store
+                loaded = None
+                known = self.store.backend.find([record['id'] for record in records] + list(deleted))
+            else:
+                loaded = self.store.records
+                known = {record['id']: record for record in loaded}
+            batch = WriteBatch()
+            batch.deleted.update(notification_id for notification_id in deleted if notification_id in known)
+            for record in records:
+                current = known.get(record['id'])
+                if current is None:
+                    batch.added.append(record)
+                    continue
+                fields = {key: value for key, value in record.items() if key != 'id'}
+                # Our own changes come back from the server too; don't rewrite the file for those
+                if any(current.get(key) != value for key, value in fields.items()):
+                    batch.updates[record['id']] = fields
+            if not batch.is_empty():
+                self.store.backend.apply(batch, loaded)
+                self.store.refresh()
+
+
+# Shared writer for the default store
+_writer = None
+
+
+def get_writer():
+    """Return the process-wide notification writer."""
+    global _writer
+    if _writer is None:
+        _writer = NotificationWriter(get_store())
+    return _writer
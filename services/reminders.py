@@ -0,0 +1,278 @@
+"""In-app reminders at the start of today's appointments.
+
+Due times are kept in a min-heap with a single Clock event armed for the earliest
+one. When it fires, everything that is due is popped and the event is re-armed for
+the new head, so thousands of pending reminders cost one scheduled event. Adding
+is a heap push and cancelling only forgets the entry (it is dropped when it
+reaches the head), so both are O(log n).
+"""
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta
+
+from kivy.clock import Clock
+
+from services.background import BackgroundTask
+from services.live_updates import get_live_notifications
+from services.log import get_logger
+from services.notification_model import NO_TIME
+from services.notification_query import record_date
+from services.notification_store import get_store
+from services.notification_writer import get_writer
+from services.scheduler import start_minutes
+
+log = get_logger(__name__)
+
+# Clock events can fire a little before their timeout; entries due this close are fired anyway
+FIRE_TOLERANCE = 0.05
+
+# Rebuild the heap once cancelled entries outnumber live ones by this much
+COMPACT_SLACK = 64
+
+# Queue key of the midnight entry that rolls the reminders over to the next day
+_NEW_DAY = ('reminders', 'new day')
+
+
+class ReminderQueue(object):
+    """Keys with due timestamps, handed to `on_due([(key, payload), ...])` when due.
+
+    Heap entries are (due, sequence, key, payload); the sequence keeps equal due
+    times in insertion order and stops the comparison before the key. An entry is
+    live while it is the one `_entries` holds for its key.
+    """
+
+    def __init__(self, on_due, clock=time.time):
+        self.on_due = on_due
+        self._now = clock
+        self._heap = []
+        self._entries = {}
+        self._sequence = itertools.count()
+        self._event = None
+        # Due time the Clock event is armed for, None when nothing is armed
+        self._armed_due = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def due_time(self, key):
+        """Return the timestamp `key` is due at, or None if it isn't pending."""
+        entry = self._entries.get(key)
+        return None if entry is None else entry[0]
+
+    def add(self, key, due, payload=None):
+        """Fire `key` at timestamp `due`, replacing any pending reminder for it."""
+        entry = (due, next(self._sequence), key, payload)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + COMPACT_SLACK:
+            self._compact()
+        # Only a new head moves the armed event
+        if self._armed_due is None or due < self._armed_due:
+            self._arm()
+
+    def cancel(self, key):
+        """Forget the pending reminder for `key`; returns whether there was one."""
+        if self._entries.pop(key, None) is None:
+            return False
+        if not self._entries:
+            self.clear()
+        elif len(self._heap) > 2 * len(self._entries) + COMPACT_SLACK:
+            self._compact()
+        # A cancelled head is left armed: the event finds nothing due and re-arms
+        return True
+
+    def clear(self):
+        """Drop every pending reminder."""
+        self._heap = []
+        self._entries.clear()
+        self._disarm()
+
+    def _is_live(self, entry):
+        return self._entries.get(entry[2]) is entry
+
+    def _compact(self):
+        """Rebuild the heap from the live entries only."""
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
+
+    def _disarm(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+        self._armed_due = None
+
+    def _arm(self):
+        """Schedule the Clock event for the earliest live entry."""
+        heap = self._heap
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+        self._disarm()
+        if heap:
+            self._armed_due = heap[0][0]
+            self._event = Clock.schedule_once(self._fire, max(0, self._armed_due - self._now()))
+
+    def _fire(self, dt):
+        """Pop everything that is due, re-arm for the next entry, then report."""
+        self._event = None
+        self._armed_due = None
+        now = self._now() + FIRE_TOLERANCE
+        heap = self._heap
+        due = []
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._is_live(entry):
+                del self._entries[entry[2]]
+                due.append((entry[2], entry[3]))
+        self._arm()
+        if due:
+            self.on_due(due)
+
+
+def _midnight(day):
+    """Return the timestamp of local midnight at the start of `day`."""
+    return datetime.combine(day, datetime.min.time()).timestamp()
+
+
+class NotificationReminders(object):
+    """Reminds about each of today's appointments when it starts.
+
+    The queue is filled from the store's schedule and kept current from the live
+    store deltas. A due reminder marks its notification unread again and is passed
+    to the subscribers right away, without waiting for that write.
+    """
+
+    def __init__(self, store, live, lead=0):
+        self.store = store
+        self.live = live
+        # Minutes before the start of an appointment to remind at
+        self.lead = lead
+        self.queue = ReminderQueue(self._on_due)
+        # Ids reminded about today, for highlighting in the list
+        self.due_ids = set()
+        self._subscribers = []
+        self._task = None
+        self._started = False
+        self._day = None
+
+    def subscribe(self, callback):
+        """Call `callback(records)` on the main thread when reminders are due."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self):
+        if not self._started:
+            self._started = True
+            self.live.subscribe(self._on_notifications_changed)
+            self.reload()
+
+    def stop(self):
+        if self._started:
+            self._started = False
+            self.live.unsubscribe(self._on_notifications_changed)
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            self.queue.clear()
+
+    def reload(self):
+        """Rebuild the queue from today's schedule, read on a worker thread."""
+        if self._task is not None:
+            self._task.cancel()
+        self._task = BackgroundTask(
+                self._read_schedule,
+                on_done=self._on_schedule_ready,
+                on_error=lambda error: log.warning("Error reading reminders: %s", error)
+        ).start()
+
+    def _read_schedule(self):
+        """Runs on a worker thread."""
+        self.store.refresh()
+        return self.store.schedule()
+
+    def _on_schedule_ready(self, schedule):
+        """Main thread: queue a reminder for every appointment still ahead today."""
+        self._task = None
+        if not self._started:
+            return
+        now = datetime.now()
+        today = now.date()
+        if today != self._day:
+            self._day = today
+            self.due_ids.clear()
+        self.queue.clear()
+        self.queue.add(_NEW_DAY, _midnight(today + timedelta(days=1)))
+
+        # Schedule is in time order: skip what has already started, with a bisect
+        minute = now.hour * 60 + now.minute + self.lead
+        for start, end, record in schedule.upcoming(minute, len(schedule)):
+            self._add(record, start)
+        log.debug("%d reminders pending", len(self.queue) - 1)
+
+    def _due_time(self, start):
+        return _midnight(self._day) + (start - self.lead) * 60
+
+    def _add(self, record, start=None):
+        """Queue (or re-queue) the reminder for `record`, or cancel it if it is no longer ahead."""
+        if start is None:
+            start = start_minutes(record)
+        # Appointments on other days are reminded about once their day has come
+        if start != NO_TIME and record_date(record, self._day) == self._day:
+            due = self._due_time(start)
+            if due > time.time():
+                self.queue.add(record['id'], due, record)
+                return
+        self.queue.cancel(record['id'])
+
+    def _on_notifications_changed(self, delta):
+        """Patch the queue from a live store delta."""
+        if self._day is None:
+            # The initial load hasn't finished; it will read the new version
+            return
+        if not delta.complete:
+            self.reload()
+            return
+        for notification_id in delta.removed:
+            self.queue.cancel(notification_id)
+        for index, record in delta.added:
+            self._add(record)
+        for index, record in delta.changed:
+            self._add(record)
+
+    def _on_due(self, due):
+        """Main thread: reminders are due, or the day has changed."""
+        records = []
+        for key, record in due:
+            if key == _NEW_DAY:
+                self.reload()
+            else:
+                records.append(record)
+        if not records:
+            return
+
+        log.debug("%d reminders due", len(records))
+        writer = get_writer()
+        for record in records:
+            self.due_ids.add(record['id'])
+            # The bell follows the unread count, also after a restart
+            writer.mark_read(record['id'], False)
+        for callback in list(self._subscribers):
+            callback(records)
+
+
+# Shared instance for the default store
+_reminders = None
+
+
+def get_reminders():
+    """Return the process-wide reminders service."""
+    global _reminders
+    if _reminders is None:
+        _reminders = NotificationReminders(get_store(), get_live_notifications())
+    return _reminders
@@ -0,0 +1,134 @@
+"""Time-indexed view of the appointments behind the notifications.
+
+`Schedule` parses each record's clock time and duration into minute offsets and
+keeps them in sorted arrays, so "what's next", "what overlaps this slot" and
+"free slots today" are answered with bisect instead of scanning every record.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+from services.notification_model import NO_TIME, clock_minutes
+from services.timeparse import parse_duration
+
+# Assumed length of appointments without a (parseable) duration, in minutes
+DEFAULT_DURATION = 30
+
+# Working hours searched for free slots, in minutes since midnight
+DAY_START = 8 * 60
+DAY_END = 18 * 60
+
+# duration string -> minutes; there are only a handful of distinct durations
+_durations = {}
+
+
+def start_minutes(record):
+    """Return the record's start in minutes since midnight, or NO_TIME."""
+    minutes = getattr(record, 'minutes', None)
+    if minutes is None:
+        minutes = clock_minutes(record.get('time', ''))
+    return minutes
+
+
+def duration_minutes(record):
+    """Return the record's duration in minutes, DEFAULT_DURATION if unknown."""
+    text = record.get('duration', None)
+    minutes = _durations.get(text)
+    if minutes is None:
+        minutes = parse_duration(text)
+        minutes = DEFAULT_DURATION if minutes is None else minutes
+        if len(_durations) < 1000:
+            _durations[text] = minutes
+    return minutes
+
+
+class Schedule(object):
+    """Read-only sequence of records in time order (start, then id).
+
+    Records without a parseable time come first, like in the SQLite backend's
+    (minutes, id) index. Starts, ends and the running maximum of ends are kept in
+    int arrays; overlapping appointments are merged into busy blocks for free slots.
+    Records are looked up in the source sequence by index, so a columnar source
+    stays columnar.
+    """
+
+    def __init__(self, records=()):
+        self._source = records
+        entries = []
+        for index, record in enumerate(records):
+            start = start_minutes(record)
+            end = NO_TIME if start == NO_TIME else start + duration_minutes(record)
+            entries.append((start, record['id'], end, index))
+        entries.sort()
+
+        self._order = array('i', (entry[3] for entry in entries))
+        self.starts = array('i', (entry[0] for entry in entries))
+        self.ends = array('i', (entry[2] for entry in entries))
+        # Never decreases, so bisect finds the first appointment that can reach a given minute
+        self._max_end = array('i', accumulate(self.ends, max))
+        self._first_scheduled = bisect_left(self.starts, 0)
+
+        # Busy blocks: the union of all appointments, as disjoint sorted intervals
+        self._busy_starts = array('i')
+        self._busy_ends = array('i')
+        for position in range(self._first_scheduled, len(self.starts)):
+            start, end = self.starts[position], self.ends[position]
+            if self._busy_ends and start <= self._busy_ends[-1]:
+                self._busy_ends[-1] = max(self._busy_ends[-1], end)
+            else:
+                self._busy_starts.append(start)
+                self._busy_ends.append(end)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._source[index] for index in self._order[position]]
+        return self._source[self._order[position]]
+
+    def __iter__(self):
+        for index in self._order:
+            yield self._source[index]
+
+    def next_after(self, minute):
+        """Return (start, end, record) of the first appointment starting at or after `minute`, or None."""
+        position = bisect_left(self.starts, max(minute, 0))
+        if position == len(self.starts):
+            return None
+        return self.starts[position], self.ends[position], self[position]
+
+    def upcoming(self, minute, limit):
+        """Return up to `limit` (start, end, record) tuples starting at or after `minute`."""
+        position = bisect_left(self.starts, max(minute, 0))
+        return [
+                (self.starts[index], self.ends[index], self[index])
+                for index in range(position, min(position + limit, len(self.starts)))
+        ]
+
+    def overlapping(self, start, end, limit=None):
+        """Return (start, end, record) of the appointments that overlap [start, end), at most `limit`."""
+        # Everything from `first` on can end after `start`; nothing from `stop` on starts before `end`
+        first = bisect_right(self._max_end, start)
+        stop = bisect_left(self.starts, end)
+        found = []
+        for index in range(first, stop):
+            if self.ends[index] > start:
+                found.append((self.starts[index], self.ends[index], self[index]))
+                if len(found) == limit:
+                    break
+        return found
+
+    def free_slots(self, day_start=DAY_START, day_end=DAY_END, min_length=1):
+        """Return the (start, end) gaps of at least `min_length` minutes between day_start and day_end."""
+        slots = []
+        cursor = day_start
+        block = bisect_right(self._busy_ends, day_start)
+        while block < len(self._busy_starts) and self._busy_starts[block] < day_end:
+            if self._busy_starts[block] - cursor >= min_length:
+                slots.append((cursor, self._busy_starts[block]))
+            cursor = max(cursor, self._busy_ends[block])
+            block += 1
+        if day_end - cursor >= min_length:
+            slots.append((cursor, day_end))
+        return slots
@@ -0,0 +1,129 @@
+"""Opt-in cold start profiler (python main.py --profile-startup).
+
+Times the execution of every module imported after `start()`, plus any section
+wrapped in `section()`, and prints a report once the first frame is drawn.
+"""
+import importlib.abc
+import sys
+import time
+from contextlib import contextmanager
+
+# The running profiler, None unless --profile-startup was given
+_profiler = None
+
+
+class _TimedLoader(importlib.abc.Loader):
+    """Wrap a module loader to time `exec_module`."""
+
+    def __init__(self, loader, profiler):
+        self.loader = loader
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self.profiler.timed('import ' + module.__name__):
+            self.loader.exec_module(module)
+
+    def __getattr__(self, name):
+        # Resource readers, get_source, ... go to the wrapped loader
+        return getattr(self.loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path hook that wraps the loader of every module found by the other finders."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader, self.profiler)
+                return spec
+        return None
+
+
+class StartupProfiler(object):
+    """Collects inclusive and self time of imports and build sections."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        # name -> [inclusive seconds, self seconds]
+        self.timings = {}
+        self._stack = []
+        self._finder = _TimingFinder(self)
+
+    def install(self):
+        sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+
+    @contextmanager
+    def timed(self, name):
+        """Time a block; nested blocks are subtracted from the parent's self time."""
+        start = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            entry = self.timings.setdefault(name, [0.0, 0.0])
+            entry[0] += elapsed
+            entry[1] += elapsed - children
+
+    def report(self, limit=25):
+        """Return the report as text, slowest self time first."""
+        total = time.perf_counter() - self.started
+        lines = [
+                f"Startup profile: {total * 1000:.1f} ms until first frame",
+                f"{'self ms':>9} {'total ms':>9}  section"
+        ]
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (inclusive, own) in ranked[:limit]:
+            lines.append(f"{own * 1000:>9.1f} {inclusive * 1000:>9.1f}  {name}")
+        return '\n'.join(lines)
+
+
+def start():
+    """Start profiling imports and build sections."""
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def get_profiler():
+    """Return the running profiler, or None."""
+    return _profiler
+
+
+@contextmanager
+def section(name):
+    """Time a block of startup work when profiling, do nothing otherwise."""
+    if _profiler is None:
+        yield
+        return
+    with _profiler.timed(name):
+        yield
+
+
+def finish():
+    """Stop profiling and print the report."""
+    global _profiler
+    if _profiler is None:
+        return
+    _profiler.uninstall()
+    print(_profiler.report())
+    _profiler = None
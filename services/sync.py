@@ -0,0 +1,387 @@
+"""Two-way sync of notifications and clients with the clinic server.
+
+Local changes are queued as operations in a persistent outbox. A worker thread sends
+them to the server in gzip-compressed batches and pulls back every record the server
+has stamped with a version newer than the last one seen. Pulled records are written
+to the local store and client directory, so the panels keep reading local data and
+are told about changes the usual way (live store deltas).
+
+Every operation carries a unique id and stays in the outbox until the server has
+acknowledged it. A batch resent after a lost response is therefore harmless: the
+server skips the operation ids it has already applied.
+
+Protocol (see tools/sync_server.py for the stand-in server), one POST per round trip:
+
+    request:  {"since": 41, "limit": 500, "ops": [{"op": "<uuid>", "collection": "notifications",
+               "action": "put", "id": "...", "fields": {...}}, ...]}
+    response: {"version": 57, "more": false, "applied": <number of ops>,
+               "changes": {"notifications": [{"id": ..., "version": 45, ...}, ...], "clients": [...]}}
+
+Deleted records come back as {"id": ..., "version": ..., "deleted": true}.
+"""
+import gzip
+import json
+import os
+import threading
+import urllib.request
+import uuid
+
+from kivy.clock import Clock
+
+from services.client_directory import get_directory
+from services.log import get_logger
+from services.notification_backends import atomic_write, normalize_id
+from services.notification_writer import get_writer
+
+log = get_logger(__name__)
+
+# Local sync bookkeeping
+OUTBOX_PATH = './data/outbox.jsonl'
+SYNC_STATE_PATH = './data/sync_state.json'
+
+# Seconds between syncs while nothing changes locally
+SYNC_INTERVAL = 30
+
+# Wait this long after a failed sync, doubling up to MAX_BACKOFF
+FIRST_BACKOFF = 5
+MAX_BACKOFF = 300
+
+# Operations sent, and changes pulled, per request
+PUSH_BATCH = 200
+PULL_LIMIT = 500
+
+# Records read per query when queuing an indexed store for its first upload
+UPLOAD_CHUNK = 1000
+
+# Seconds before a request is given up
+REQUEST_TIMEOUT = 20
+
+NOTIFICATIONS = 'notifications'
+CLIENTS = 'clients'
+
+# Record fields that are synced, by collection (the id travels separately)
+SYNCED_FIELDS = {
+        NOTIFICATIONS: ('time', 'title', 'duration', 'read', 'date'),
+        CLIENTS: ('name', 'phone', 'notes')
+}
+
+
+def encode_payload(value):
+    """Return `value` as gzip-compressed JSON."""
+    return gzip.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+
+
+def decode_payload(data, compressed=True):
+    """Return the value of a (gzip-compressed) JSON payload."""
+    if compressed:
+        data = gzip.decompress(data)
+    return json.loads(data.decode('utf-8'))
+
+
+def make_op(collection, action, record_id=None, fields=None):
+    """Return a new operation with a unique id."""
+    op = {'op': uuid.uuid4().hex, 'collection': collection, 'action': action}
+    if record_id is not None:
+        op['id'] = record_id
+    if fields:
+        op['fields'] = fields
+    return op
+
+
+def _synced(collection, record):
+    """Return the synced fields of `record`."""
+    return {name: record[name] for name in SYNCED_FIELDS[collection] if name in record}
+
+
+def batch_to_ops(batch):
+    """Return the operations for a notification WriteBatch, in the order the batch applies them."""
+    ops = [make_op(NOTIFICATIONS, 'delete', notification_id) for notification_id in batch.deleted]
+    if batch.mark_all_read:
+        ops.append(make_op(NOTIFICATIONS, 'mark_all_read'))
+    for notification_id, fields in batch.updates.items():
+        ops.append(make_op(NOTIFICATIONS, 'put', notification_id, _synced(NOTIFICATIONS, fields)))
+    for record in batch.added:
+        ops.append(make_op(NOTIFICATIONS, 'put', record['id'], _synced(NOTIFICATIONS, record)))
+    return ops
+
+
+class Outbox(object):
+    """Operations waiting to be sent, kept in a JSON lines file until acknowledged."""
+
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        self._ops = None
+        # Written from the main thread, sent and acknowledged from the sync thread
+        self._lock = threading.Lock()
+        # Called (on the adding thread) after operations were queued
+        self.on_added = None
+
+    def _load(self):
+        if self._ops is None:
+            self._ops = []
+            try:
+                with open(self.path) as file:
+                    for line in file:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self._ops.append(json.loads(line))
+                        except ValueError:
+                            # Torn last line after a crash; that operation was never acknowledged
+                            log.warning("Skipping a damaged outbox entry")
+            except FileNotFoundError:
+                pass
+        return self._ops
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def extend(self, ops):
+        """Queue operations; they are on disk when this returns."""
+        if not ops:
+            return
+        with self._lock:
+            self._load().extend(ops)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a') as file:
+                file.write(''.join(json.dumps(op, separators=(',', ':')) + '\n' for op in ops))
+        if self.on_added is not None:
+            self.on_added()
+
+    def add_batch(self, batch):
+        """Queue the operations of a notification WriteBatch."""
+        self.extend(batch_to_ops(batch))
+
+    def add_clients(self, clients):
+        """Queue new or changed clients (each with a 'uid')."""
+        self.extend([make_op(CLIENTS, 'put', client['uid'], _synced(CLIENTS, client)) for client in clients])
+
+    def pending(self, limit):
+        """Return up to `limit` of the oldest operations."""
+        with self._lock:
+            return list(self._load()[:limit])
+
+    def acknowledge(self, count):
+        """Drop the `count` oldest operations, which the server has applied."""
+        if count <= 0:
+            return
+        with self._lock:
+            ops = self._load()
+            del ops[:count]
+            atomic_write(self.path, ''.join(json.dumps(op, separators=(',', ':')) + '\n' for op in ops))
+
+
+class SyncResult(object):
+    """What one sync round did."""
+
+    def __init__(self, pushed=0, notifications=0, clients=0, version=0):
+        self.pushed = pushed
+        self.notifications = notifications
+        self.clients = clients
+        self.version = version
+
+
+class SyncEngine(object):
+    """Sends the outbox and pulls newer records on a background thread.
+
+    Results are delivered to subscribers on the kivy main thread. Failed rounds are
+    retried with exponential backoff; local changes wake the thread right away.
+    """
+
+    def __init__(self, outbox, writer, directory, state_path=SYNC_STATE_PATH, interval=SYNC_INTERVAL):
+        self.outbox = outbox
+        self.writer = writer
+        self.directory = directory
+        self.state_path = state_path
+        self.interval = interval
+        self.url = None
+        self._state = None
+        self._subscribers = []
+        self._thread = None
+        self._stopping = threading.Event()
+        self._wake = threading.Event()
+
+    def subscribe(self, callback):
+        """Call `callback(result)` on the main thread after every round that changed something."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, url):
+        """Start syncing with the server at `url`; local changes are queued from now on."""
+        if self._thread is not None:
+            return
+        self.url = url
+        self.writer.outbox = self.outbox
+        self.directory.outbox = self.outbox
+        self.outbox.on_added = self.request_sync
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name='sync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the sync thread; queued operations stay in the outbox for next time."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join(timeout=REQUEST_TIMEOUT)
+        self._thread = None
+        self.outbox.on_added = None
+
+    def request_sync(self):
+        """Sync as soon as possible, e.g. after a local change."""
+        self._wake.set()
+
+    def _run(self):
+        delay = 0
+        backoff = FIRST_BACKOFF
+        while not self._stopping.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                result = self.sync_once()
+            except (OSError, ValueError, KeyError) as e:
+                # Offline, server down or a garbled response: keep the outbox and try again later
+                delay, backoff = backoff, min(MAX_BACKOFF, backoff * 2)
+                log.info("Sync failed (%s), retrying in %d s", e, delay)
+                continue
+            except Exception:
+                # A bug rather than the network; the thread must outlive it, or the outbox never drains
+                delay, backoff = backoff, min(MAX_BACKOFF, backoff * 2)
+                log.exception("Sync failed unexpectedly, retrying in %d s", delay)
+                continue
+            delay, backoff = self.interval, FIRST_BACKOFF
+            if result.pushed or result.notifications or result.clients:
+                Clock.schedule_once(lambda dt, result=result: self._publish(result))
+
+    def _publish(self, result):
+        log.debug("Synced: %d sent, %d notifications and %d clients received",
+                  result.pushed, result.notifications, result.clients)
+        for callback in list(self._subscribers):
+            callback(result)
+
+    def _load_state(self):
+        if self._state is None:
+            try:
+                with open(self.state_path) as file:
+                    self._state = json.load(file)
+            except (OSError, ValueError):
+                self._state = {}
+            self._state.setdefault('version', 0)
+            self._state.setdefault('uploaded', False)
+        return self._state
+
+    def _save_state(self):
+        atomic_write(self.state_path, json.dumps(self._state))
+
+    def _queue_initial_upload(self):
+        """Queue every local record once, so data from before sync was set up reaches the server."""
+        store = self.writer.store
+        store.refresh()
+        if store.backend.indexed:
+            # A page at a time rather than the whole table at once
+            cursor = None
+            while True:
+                records, cursor = store.backend.page_after(cursor, UPLOAD_CHUNK)
+                if not records:
+                    break
+                self.outbox.extend([
+                        make_op(NOTIFICATIONS, 'put', record['id'], _synced(NOTIFICATIONS, record))
+                        for record in records
+                ])
+        else:
+            self.outbox.extend([
+                    make_op(NOTIFICATIONS, 'put', record['id'], _synced(NOTIFICATIONS, dict(record)))
+                    for record in store.records
+            ])
+        self.outbox.add_clients(self.directory.all_clients())
+
+    def sync_once(self):
+        """Run one round: send pending operations, then pull every newer change. Runs on the sync thread."""
+        state = self._load_state()
+        if not state['uploaded']:
+            self._queue_initial_upload()
+            state['uploaded'] = True
+            self._save_state()
+
+        result = SyncResult(version=state['version'])
+        more = True
+        while more:
+            ops = self.outbox.pending(PUSH_BATCH)
+            response = self._post({'since': state['version'], 'limit': PULL_LIMIT, 'ops': ops})
+            # The server applied (or had already applied) this many of our operations
+            self.outbox.acknowledge(response.get('applied', 0))
+            result.pushed += response.get('applied', 0)
+
+            changes = response.get('changes', {})
+            result.notifications += self._apply_notifications(changes.get(NOTIFICATIONS, []))
+            result.clients += self._apply_clients(changes.get(CLIENTS, []))
+
+            state['version'] = result.version = response['version']
+            self._save_state()
+            # Go round again while the server has more changes or a full batch was sent
+            more = response.get('more', False) or (len(ops) == PUSH_BATCH and len(self.outbox) > 0)
+        return result
+
+    def _post(self, body):
+        request = urllib.request.Request(
+                self.url,
+                data=encode_payload(body),
+                headers={
+                        'Content-Type': 'application/json',
+                        'Content-Encoding': 'gzip',
+                        'Accept-Encoding': 'gzip'
+                },
+                method='POST'
+        )
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+            data = response.read()
+            return decode_payload(data, response.headers.get('Content-Encoding') == 'gzip')
+
+    def _apply_notifications(self, changes):
+        if not changes:
+            return 0
+        # Another client may send numeric ids; past the backends ids are strings
+        deleted = [normalize_id(change['id']) for change in changes if change.get('deleted')]
+        records = [
+                dict(_synced(NOTIFICATIONS, change), id=normalize_id(change['id']))
+                for change in changes if not change.get('deleted')
+        ]
+        self.writer.merge(records, deleted)
+        return len(changes)
+
+    def _apply_clients(self, changes):
+        if not changes:
+            return 0
+        deleted = [change['id'] for change in changes if change.get('deleted')]
+        clients = [
+                dict(_synced(CLIENTS, change), uid=change['id'])
+                for change in changes if not change.get('deleted')
+        ]
+        self.directory.merge(clients, deleted)
+        return len(changes)
+
+
+# Shared engine for the default store and directory
+_engine = None
+
+
+def get_sync():
+    """Return the process-wide sync engine (started by the app when a server is configured)."""
+    global _engine
+    if _engine is None:
+        _engine = SyncEngine(Outbox(), get_writer(), get_directory())
+    return _engine
@@ -0,0 +1,54 @@
+import re
+
+# "9:00 am", "11:30PM", "14:05" ...
+_CLOCK_TIME = re.compile(r'^\s*(\d{1,2})(?::(\d{2}))?\s*([ap]\.?m\.?)?\s*$', re.IGNORECASE)
+
+
+def parse_clock_time(text):
+    """Parse a clock time such as "9:00 am" into minutes since midnight, or None."""
+    if not text:
+        return None
+    match = _CLOCK_TIME.match(text)
+    if match is None:
+        return None
+
+    hours = int(match.group(1))
+    minutes = int(match.group(2) or 0)
+    suffix = match.group(3)
+    if suffix:
+        if hours < 1 or hours > 12:
+            return None
+        # 12 am is midnight, 12 pm is noon
+        hours %= 12
+        if suffix[0].lower() == 'p':
+            hours += 12
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+# "5h", "30m", "1h30m", "1.5 hours", "45 min", "90" (minutes) ...
+_DURATION = re.compile(
+        r'^\s*(?:(\d+(?:\.\d+)?)\s*h(?:ours?|rs?)?)?\s*(?:(\d+)\s*m(?:in(?:ute)?s?)?)?\s*$',
+        re.IGNORECASE
+)
+
+
+def parse_duration(text):
+    """Parse a duration such as "5h", "1h30m" or "45 min" into minutes, or None."""
+    if not text:
+        return None
+    text = text.strip()
+    if text.isdigit():
+        return int(text)
+    match = _DURATION.match(text)
+    if match is None or not (match.group(1) or match.group(2)):
+        return None
+    return int(round(float(match.group(1) or 0) * 60)) + int(match.group(2) or 0)
+
+
+def format_clock_time(minutes):
+    """Format minutes since midnight as "9:00 am" (wrapping past midnight)."""
+    hours, minutes = divmod(minutes % (24 * 60), 60)
+    suffix = 'am' if hours < 12 else 'pm'
+    return '%d:%02d %s' % (hours % 12 or 12, minutes, suffix)
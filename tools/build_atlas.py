@@ -0,0 +1,57 @@
+"""Pack the UI icons in images/ into a single kivy atlas (images/icons.atlas).
+
+Icons are drawn at 33dp at most, so they are scaled down to `--icon-size` pixels
+before packing to keep the atlas to one small texture. Run at packaging time,
+before buildozer:
+
+    python tools/build_atlas.py
+"""
+import argparse
+import glob
+import os
+import sys
+import tempfile
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+
+from kivy.atlas import Atlas  # noqa: E402
+from PIL import Image  # noqa: E402
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'images')
+ATLAS_NAME = 'icons'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the icon atlas.')
+    parser.add_argument('--icon-size', type=int, default=128, help='Largest icon side, in pixels')
+    parser.add_argument('--atlas-size', type=int, default=512, help='Atlas page side, in pixels')
+    arguments = parser.parse_args()
+
+    # Skip pages of a previous atlas build
+    icons = sorted(
+            path for path in glob.glob(os.path.join(IMAGES_DIR, '*.png'))
+            if not os.path.basename(path).startswith(ATLAS_NAME + '-')
+    )
+    if not icons:
+        print("No icons to pack")
+        return
+
+    with tempfile.TemporaryDirectory() as scaled_dir:
+        # Atlas keys are the file names without extension, so keep the names
+        scaled = []
+        for path in icons:
+            image = Image.open(path)
+            image.thumbnail((arguments.icon_size, arguments.icon_size), Image.LANCZOS)
+            scaled_path = os.path.join(scaled_dir, os.path.basename(path))
+            image.save(scaled_path)
+            scaled.append(scaled_path)
+
+        result = Atlas.create(os.path.join(IMAGES_DIR, ATLAS_NAME), scaled, arguments.atlas_size)
+
+    if not result:
+        sys.exit("Failed to build the icon atlas")
+    print(f"Packed {len(icons)} icons into {len(result[1])} page(s): {result[0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Sync round trip against the stand-in server (tools/sync_server.py).
+
+Three devices, each with its own notification store (JSON, JSON lines and SQLite),
+outbox and client directory in a scratch directory, sync through one server that
+drops every few responses. Changes made on any device must reach the others with
+the same ids, even when
+a response is lost or the sync thread hits an unexpected error, and the outboxes
+must drain. Exits with an error on the first check that fails. Run from the
+repository root:
+
+    python -m tools.sync_roundtrip
+"""
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+os.environ.setdefault('KIVY_NO_FILELOG', '1')
+
+from services import sync  # noqa: E402
+from services.client_directory import ClientDirectory  # noqa: E402
+from services.notification_backends import assign_ids, open_backend  # noqa: E402
+from services.notification_store import NotificationStore  # noqa: E402
+from services.notification_writer import NotificationWriter  # noqa: E402
+from tools.sync_server import start_server  # noqa: E402
+
+# Fail every Nth request after the server applied it
+DROP_EVERY = 3
+
+# Seconds to wait for the devices to agree
+TIMEOUT = 20
+
+
+class Device(object):
+    """One app install: a store, its writer, a client directory and a sync engine."""
+
+    def __init__(self, root, name, notifications_file):
+        path = os.path.join(root, name)
+        os.makedirs(path)
+        self.name = name
+        self.store = NotificationStore(open_backend(os.path.join(path, notifications_file)))
+        self.writer = NotificationWriter(self.store)
+        self.clients = ClientDirectory(os.path.join(path, 'clients.db'))
+        self.engine = sync.SyncEngine(
+                sync.Outbox(os.path.join(path, 'outbox.jsonl')),
+                self.writer,
+                self.clients,
+                state_path=os.path.join(path, 'sync_state.json'),
+                interval=0.1
+        )
+
+    def notifications(self):
+        """Return {id: (title, read)} of every notification on the device."""
+        records = assign_ids(self.store.backend.load()) if self.store.exists() else []
+        return {record['id']: (record.get('title'), bool(record.get('read', False))) for record in records}
+
+    def client_names(self):
+        return sorted(client['name'] for client in self.clients.all_clients())
+
+
+def fail(message):
+    # Printed rather than passed to sys.exit: kivy redirects stderr to its logger
+    print("FAILED: " + message)
+    sys.exit(1)
+
+
+def wait(condition, message):
+    """Wait until `condition()` is true, or fail with `message`."""
+    deadline = time.time() + TIMEOUT
+    while not condition():
+        if time.time() > deadline:
+            fail(message)
+        time.sleep(0.05)
+
+
+def check(condition, message):
+    if not condition:
+        fail(message)
+    print("ok   " + message)
+
+
+def main():
+    # Retry quickly, so the lost responses don't slow the run down
+    sync.FIRST_BACKOFF = 0.1
+    sync.MAX_BACKOFF = 0.5
+
+    root = tempfile.mkdtemp(prefix='sync-roundtrip-')
+    server = start_server(drop_every=DROP_EVERY)
+    first = Device(root, 'first', 'notifications.json')
+    second = Device(root, 'second', 'notifications.jsonl')
+    third = Device(root, 'third', 'notifications.db')
+    devices = (first, second, third)
+
+    # Data from before sync was set up is uploaded once the engine starts
+    meeting = first.writer.add({'time': '9:00 am', 'title': 'Client Meeting', 'duration': '1h'})
+    first.writer.flush()
+    first.clients.add('Alice Johnson', '555-0101')
+
+    # The SQLite device has data from before sync too, under its own text ids
+    lunch = third.writer.add({'time': '12:30 pm', 'title': 'Lunch With Carol'})
+    third.writer.flush()
+
+    for device in devices:
+        device.engine.start(server.url)
+    try:
+        wait(lambda: all(meeting in device.notifications() for device in devices), "a notification reaches the others")
+        wait(lambda: all(lunch in device.notifications() for device in devices), "an indexed store's notification is uploaded")
+        wait(lambda: all(device.client_names() == ['Alice Johnson'] for device in devices), "a client reaches the others")
+        check(True, "notifications and clients from before sync reach the other devices")
+
+        # Changes made while syncing, in both directions
+        standup = second.writer.add({'time': '11:00 am', 'title': 'Team Standup'})
+        second.writer.mark_read(meeting)
+        second.writer.flush()
+        first.clients.add('Brian Smith', '555-0102')
+        third.writer.mark_read(lunch)
+        third.writer.flush()
+        expected = {
+                meeting: ('Client Meeting', True), standup: ('Team Standup', False), lunch: ('Lunch With Carol', True)
+        }
+        wait(lambda: all(device.notifications() == expected for device in devices),
+             "changes reach every device with the same ids")
+        wait(lambda: all(device.client_names() == ['Alice Johnson', 'Brian Smith'] for device in devices),
+             "a new client is synced")
+        check(True, "changes travel every way with the same ids")
+
+        first.writer.dismiss(standup)
+        first.writer.flush()
+        wait(lambda: all(standup not in device.notifications() for device in devices),
+             "a dismissed notification is deleted on the other devices")
+        check(True, "deletions are synced")
+
+        # The sync thread must outlive an unexpected error and keep draining the outbox
+        post = first.engine._post
+        failures = []
+
+        def failing_post(body):
+            if not failures:
+                failures.append(body)
+                raise RuntimeError("simulated bug")
+            return post(body)
+
+        first.engine._post = failing_post
+        deadline = first.writer.add({'time': '4:30 pm', 'title': 'Project Deadline'})
+        first.writer.flush()
+        wait(lambda: all(deadline in device.notifications() for device in devices),
+             "the sync thread recovers from an unexpected error")
+        check(failures and first.engine.running, "the sync thread survives an unexpected error")
+
+        wait(lambda: all(len(device.engine.outbox) == 0 for device in devices), "the outboxes drain")
+        check(server.requests >= DROP_EVERY, "the outboxes drain although 1 in %d responses was lost" % DROP_EVERY)
+    finally:
+        for device in devices:
+            device.engine.stop()
+        server.shutdown()
+    print("Sync round trip passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""Local stand-in for the clinic sync server, for development and tests.
+
+Keeps every collection in memory, stamps each change with a global version and
+answers the app's POST /sync requests (the protocol is described in services/sync.py):
+
+    python tools/sync_server.py --port 8765
+    SCHEDULER_SYNC_URL=http://127.0.0.1:8765/sync python main.py
+
+`start_server()` runs it on a background thread and returns the server, for scripts:
+
+    server = start_server()
+    ... sync against server.url ...
+    server.shutdown()
+
+`--drop-every N` fails every Nth request after applying it, to exercise the app's retries.
+`python -m tools.sync_roundtrip` syncs two devices through it that way.
+"""
+import argparse
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SyncState(object):
+    """Collections of records by id, each stamped with the version of its last change."""
+
+    def __init__(self):
+        self.version = 0
+        self.collections = {}
+        # Operation ids already applied, so resent batches aren't applied twice
+        self.applied = set()
+        self._lock = threading.Lock()
+
+    def _stamp(self, collection, record_id, record):
+        self.version += 1
+        record['id'] = record_id
+        record['version'] = self.version
+        self.collections.setdefault(collection, {})[record_id] = record
+
+    def _apply(self, op):
+        records = self.collections.setdefault(op['collection'], {})
+        action = op['action']
+        if action == 'put':
+            record = {key: value for key, value in records.get(op['id'], {}).items() if key != 'deleted'}
+            record.update(op.get('fields', {}))
+            self._stamp(op['collection'], op['id'], record)
+        elif action == 'delete':
+            self._stamp(op['collection'], op['id'], {'deleted': True})
+        elif action == 'mark_all_read':
+            for record_id, record in list(records.items()):
+                if not record.get('deleted') and not record.get('read', False):
+                    self._stamp(op['collection'], record_id, dict(record, read=True))
+        else:
+            raise ValueError('Unknown action %r' % action)
+
+    def sync(self, request):
+        """Apply the request's operations and return the changes newer than its `since`."""
+        with self._lock:
+            ops = request.get('ops', [])
+            for op in ops:
+                if op['op'] not in self.applied:
+                    self._apply(op)
+                    self.applied.add(op['op'])
+
+            since = request.get('since', 0)
+            limit = request.get('limit', 500)
+            changed = sorted(
+                    (record['version'], collection, record)
+                    for collection, records in self.collections.items()
+                    for record in records.values()
+                    if record['version'] > since
+            )
+            more = len(changed) > limit
+            changed = changed[:limit]
+            changes = {}
+            for version, collection, record in changed:
+                changes.setdefault(collection, []).append(dict(record))
+            return {
+                    'version': changed[-1][0] if more else self.version,
+                    'more': more,
+                    'applied': len(ops),
+                    'changes': changes
+            }
+
+
+class SyncHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path.rstrip('/') != '/sync':
+            self.send_error(404)
+            return
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        try:
+            if self.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+            request = json.loads(body.decode('utf-8'))
+            response = self.server.state.sync(request)
+        except (ValueError, KeyError, OSError) as e:
+            self.send_error(400, str(e))
+            return
+
+        self.server.requests += 1
+        if self.server.drop_every and self.server.requests % self.server.drop_every == 0:
+            # Applied, but the client never hears back
+            self.send_error(503, 'Dropped on purpose')
+            return
+
+        compressed = 'gzip' in self.headers.get('Accept-Encoding', '')
+        data = json.dumps(response, separators=(',', ':')).encode('utf-8')
+        if compressed:
+            data = gzip.compress(data)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if compressed:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super(SyncHandler, self).log_message(format, *args)
+
+
+class SyncServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, drop_every=0, verbose=False):
+        super(SyncServer, self).__init__(address, SyncHandler)
+        self.state = SyncState()
+        self.drop_every = drop_every
+        self.verbose = verbose
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://%s:%d/sync' % (host, port)
+
+
+def start_server(host='127.0.0.1', port=0, drop_every=0):
+    """Serve on a daemon thread (port 0 picks a free port) and return the server."""
+    server = SyncServer((host, port), drop_every=drop_every)
+    threading.Thread(target=server.serve_forever, name='sync-server', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in sync server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--drop-every', type=int, default=0, help='Fail every Nth request after applying it')
+    arguments = parser.parse_args()
+
+    server = SyncServer((arguments.host, arguments.port), drop_every=arguments.drop_every, verbose=True)
+    print(f"Serving sync on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
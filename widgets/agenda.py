@@ -0,0 +1,76 @@
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.utils import get_color_from_hex
+
+from services.scheduler import DAY_END, DAY_START
+from services.timeparse import format_clock_time
+
+# Free slots shorter than this aren't worth showing, in minutes
+MIN_FREE_SLOT = 15
+
+# How many upcoming appointments and free slots to list
+UPCOMING_LIMIT = 3
+FREE_SLOT_LIMIT = 3
+
+
+def _span(start, end):
+    return '%s - %s' % (format_clock_time(start), format_clock_time(end))
+
+
+class AgendaSummary(BoxLayout):
+    """Today at a glance: the current appointment, what's next and the free slots."""
+
+    def __init__(self, **kwargs):
+        super(AgendaSummary, self).__init__(
+                orientation='vertical',
+                spacing=dp(10),
+                padding=[dp(5), dp(5)],
+                size_hint_y=None,
+                **kwargs
+        )
+        self.bind(minimum_height=self.setter('height'))
+
+        self.heading = self._add_label(dp(20), "#19081c", bold=True)
+        self.now_label = self._add_label(dp(16), "#333333")
+        self.next_label = self._add_label(dp(16), "#333333")
+        self.free_label = self._add_label(dp(16), "#666666")
+        self.heading.text = "Today"
+
+    def _add_label(self, font_size, color, bold=False):
+        label = Label(
+                font_size=font_size,
+                bold=bold,
+                color=get_color_from_hex(color),
+                halign='left',
+                valign='top',
+                size_hint_y=None
+        )
+        # Wrap to the available width and grow with the text
+        label.bind(width=lambda instance, value: setattr(instance, 'text_size', (value, None)))
+        label.bind(texture_size=lambda instance, value: setattr(instance, 'height', value[1]))
+        self.add_widget(label)
+        return label
+
+    def show(self, schedule, minute):
+        """Fill the labels from `schedule` for the time `minute` (minutes since midnight)."""
+        current = schedule.overlapping(minute, minute + 1, limit=UPCOMING_LIMIT)
+        if current:
+            self.now_label.text = "Now: " + ", ".join(record.get('title', '') for _, _, record in current)
+        else:
+            self.now_label.text = "Now: nothing scheduled"
+
+        upcoming = schedule.upcoming(minute + 1, UPCOMING_LIMIT)
+        if upcoming:
+            self.next_label.text = "Next:\n" + "\n".join(
+                    "%s  %s" % (format_clock_time(start), record.get('title', ''))
+                    for start, _, record in upcoming
+            )
+        else:
+            self.next_label.text = "Next: nothing else today"
+
+        slots = schedule.free_slots(day_start=max(minute, DAY_START), day_end=DAY_END, min_length=MIN_FREE_SLOT)
+        if slots:
+            self.free_label.text = "Free: " + ", ".join(_span(start, end) for start, end in slots[:FREE_SLOT_LIMIT])
+        else:
+            self.free_label.text = "Free: no slots left today"
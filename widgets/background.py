@@ -0,0 +1,80 @@
+"""Background drawing behaviors, shared by the panels and items.
+
+The canvas instructions are declared once in KV, so their pos and size follow the
+widget through KV's own property bindings instead of a Python `_update_rect`
+callback per widget. Mix a behavior in before the widget class:
+
+    class Ribbon(BackgroundBehavior, BoxLayout):
+        pass
+
+    Ribbon(fill_color=get_color_from_hex("#F6F6F6"))
+"""
+from kivy.lang import Builder
+from kivy.metrics import dp
+from kivy.properties import ColorProperty, ListProperty, NumericProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.scrollview import ScrollView
+
+Builder.load_string("""
+<BackgroundBehavior>:
+    canvas.before:
+        Color:
+            rgba: self.fill_color
+        Rectangle:
+            pos: self.pos
+            size: self.size
+
+<RoundedBackgroundBehavior>:
+    canvas.before:
+        Color:
+            rgba: self.fill_color
+        RoundedRectangle:
+            pos: self.pos
+            size: self.size
+            radius: self.fill_radius
+
+<CardBehavior>:
+    canvas.before:
+        Color:
+            rgba: self.shadow_color
+        RoundedRectangle:
+            pos: self.x + self.shadow_offset, self.y - self.shadow_offset
+            size: self.size
+            radius: self.fill_radius
+        Color:
+            rgba: self.fill_color
+        RoundedRectangle:
+            pos: self.pos
+            size: self.size
+            radius: self.fill_radius
+""")
+
+
+class BackgroundBehavior(object):
+    """Fill the widget with `fill_color`."""
+
+    fill_color = ColorProperty([1, 1, 1, 1])
+
+
+class RoundedBackgroundBehavior(object):
+    """Fill the widget with `fill_color`, with rounded corners."""
+
+    fill_color = ColorProperty([1, 1, 1, 1])
+    fill_radius = ListProperty([dp(5)])
+
+
+class CardBehavior(object):
+    """Rounded background with a drop shadow offset down and to the right."""
+
+    fill_color = ColorProperty([1, 1, 1, 1])
+    fill_radius = ListProperty([dp(10)])
+    shadow_color = ColorProperty([0.85, 0.85, 0.85, 1])
+    shadow_offset = NumericProperty(dp(2))
+
+
+class ColoredBoxLayout(BackgroundBehavior, BoxLayout):
+    """BoxLayout with a plain background color."""
+
+
+class ColoredScrollView(BackgroundBehavior, ScrollView):
+    """ScrollView with a plain background color."""
@@ -0,0 +1,140 @@
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivy.properties import StringProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.textinput import TextInput
+from kivy.utils import get_color_from_hex
+
+from services.background import BackgroundTask
+from services.client_directory import PAGE_SIZE, get_directory
+from services.log import get_logger
+
+log = get_logger(__name__)
+
+# Wait this long after the last keystroke before searching
+SEARCH_DELAY = 0.3
+
+# Fetch the next page when the list is scrolled this close to the bottom (scroll_y)
+LOAD_MORE_AT = 0.1
+
+
+class ClientRow(RecycleDataViewBehavior, BoxLayout):
+    """One client in the results list: name on the left, phone on the right."""
+
+    name = StringProperty('')
+    phone = StringProperty('')
+
+    def __init__(self, **kwargs):
+        super(ClientRow, self).__init__(
+                orientation='horizontal',
+                padding=[dp(5), 0],
+                **kwargs
+        )
+        self.name_label = Label(
+                font_size=dp(16),
+                color=get_color_from_hex("#333333"),
+                halign='left',
+                valign='middle',
+                shorten=True
+        )
+        self.name_label.bind(size=self.name_label.setter('text_size'))
+        self.phone_label = Label(
+                font_size=dp(14),
+                color=get_color_from_hex("#999999"),
+                halign='right',
+                valign='middle',
+                size_hint_x=0.4
+        )
+        self.phone_label.bind(size=self.phone_label.setter('text_size'))
+        self.add_widget(self.name_label)
+        self.add_widget(self.phone_label)
+        self.bind(name=self.name_label.setter('text'), phone=self.phone_label.setter('text'))
+
+
+class ClientSearch(BoxLayout):
+    """Search field over the client directory with the results in a RecycleView.
+
+    Typing restarts a short timer; the search runs on a worker once typing pauses,
+    and results older than the latest query are dropped. Further pages are fetched
+    as the list is scrolled towards the end.
+    """
+
+    def __init__(self, directory=None, **kwargs):
+        super(ClientSearch, self).__init__(orientation='vertical', spacing=dp(5), **kwargs)
+        self.directory = directory or get_directory()
+        self.query = ''
+        self._task = None
+        # Whether the last page was full, i.e. there may be more results
+        self._has_more = False
+
+        self.search_input = TextInput(
+                hint_text="Search clients",
+                multiline=False,
+                size_hint_y=None,
+                height=dp(40),
+                font_size=dp(16)
+        )
+        self._search_trigger = Clock.create_trigger(self._start_search, SEARCH_DELAY)
+        self.search_input.bind(text=lambda instance, value: self._search_trigger())
+
+        # Only the visible rows are built; rows have a fixed height
+        self.results = RecycleView(do_scroll_x=False)
+        layout_manager = RecycleBoxLayout(
+                orientation='vertical',
+                default_size=(None, dp(40)),
+                default_size_hint=(1, None),
+                size_hint_y=None
+        )
+        layout_manager.bind(minimum_height=layout_manager.setter('height'))
+        self.results.add_widget(layout_manager)
+        self.results.viewclass = ClientRow
+        self.results.bind(scroll_y=self._on_scroll)
+
+        self.add_widget(self.search_input)
+        self.add_widget(self.results)
+
+    def refresh(self):
+        """Run the current query again, e.g. after clients were added."""
+        self._search_trigger.cancel()
+        self._start_search()
+
+    def _start_search(self, *args):
+        self.query = self.search_input.text.strip()
+        self._fetch(self.query, 0)
+
+    def _fetch(self, query, offset):
+        """Fetch one page of results on a worker thread."""
+        if self._task is not None:
+            self._task.cancel()
+        self._task = BackgroundTask(
+                lambda: self.directory.search(query, offset, PAGE_SIZE),
+                on_done=lambda clients: self._on_results(query, offset, clients),
+                on_error=self._on_error
+        ).start()
+
+    def _on_results(self, query, offset, clients):
+        """Main thread: show a page of results for `query`."""
+        self._task = None
+        if query != self.query:
+            return
+        rows = [{'name': client['name'], 'phone': client['phone']} for client in clients]
+        if offset == 0:
+            self.results.data = rows
+            self.results.scroll_y = 1
+        else:
+            self.results.data.extend(rows)
+        self._has_more = len(clients) == PAGE_SIZE
+
+    def _on_error(self, error):
+        self._task = None
+        log.warning("Client search failed: %s", error)
+
+    def _on_scroll(self, instance, scroll_y):
+        """Fetch the next page when nearing the end of the list."""
+        if self._has_more and self._task is None and scroll_y <= LOAD_MORE_AT:
+            self._has_more = False
+            self._fetch(self.query, len(self.results.data))
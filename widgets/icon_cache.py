@@ -0,0 +1,51 @@
+import os
+
+from kivy.atlas import Atlas
+from kivy.core.image import Image as CoreImage
+from kivy.logger import Logger
+
+# Directory holding the UI icons, and the atlas built from them at packaging time
+# (see tools/build_atlas.py)
+IMAGES_DIR = './images'
+ATLAS_PATH = os.path.join(IMAGES_DIR, 'icons.atlas')
+
+# One texture per icon name for the whole process; None for icons that don't exist
+_textures = {}
+_atlas = None
+_atlas_checked = False
+
+
+def _get_atlas():
+    """Return the packaged icon atlas, or None when running from a source checkout."""
+    global _atlas, _atlas_checked
+    if not _atlas_checked:
+        _atlas_checked = True
+        if os.path.exists(ATLAS_PATH):
+            _atlas = Atlas(ATLAS_PATH)
+    return _atlas
+
+
+def get_icon(name, fallback=None):
+    """Return the shared texture for icon `name` (file name without extension).
+
+    Looks in the atlas first, then for `images/<name>.png`. Missing icons are
+    remembered, so the disk is checked and the warning logged only once.
+    If the icon is missing, the `fallback` icon is returned instead (or None).
+    """
+    if name not in _textures:
+        texture = None
+        atlas = _get_atlas()
+        if atlas is not None and name in atlas.textures:
+            texture = atlas[name]
+        else:
+            path = os.path.join(IMAGES_DIR, name + '.png')
+            if os.path.exists(path):
+                texture = CoreImage(path).texture
+            else:
+                Logger.warning(f"Icons: '{name}' not found in the atlas or {IMAGES_DIR}")
+        _textures[name] = texture
+
+    texture = _textures[name]
+    if texture is None and fallback is not None:
+        return get_icon(fallback)
+    return texture
@@ -0,0 +1,150 @@
+from kivy.graphics import Color, Rectangle, RoundedRectangle
+from kivy.lang import Builder
+from kivy.metrics import dp
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.widget import Widget
+from kivy.utils import get_color_from_hex
+
+from services.instrumentation import timed
+from widgets.icon_cache import get_icon
+from widgets.text_cache import get_text_cache
+
+# Colors, converted once
+SHADOW_COLOR = (0.85, 0.85, 0.85, 1)
+BACKGROUND_COLOR = get_color_from_hex("#FFFFFF")
+TIME_COLOR = get_color_from_hex("#666666")
+TITLE_COLOR = get_color_from_hex("#333333")
+DURATION_COLOR = get_color_from_hex("#999999")
+# Time of an appointment whose reminder has fired
+DUE_COLOR = get_color_from_hex("#D0021B")
+
+# The item draws in its own coordinates under a Translate that KV keeps on the
+# widget's pos, so moving the item (scrolling, relayout) runs no Python callback
+Builder.load_string("""
+<CompactNotificationItem>:
+    canvas.before:
+        PushMatrix
+        Translate:
+            xy: self.pos
+    canvas.after:
+        PopMatrix
+""")
+
+
+def _text_texture(text, font_size, bold=False):
+    """Return the shared texture for `text`, rendered white and tinted with a Color instruction like kivy's Label."""
+    return get_text_cache().texture(text, font_size=font_size, bold=bold)
+
+
+class CompactNotificationItem(RecycleDataViewBehavior, Widget):
+    """Notification item drawn directly on its canvas, without child widgets.
+
+    Looks the same as `panels.home_panel.NotificationItem`: same shadow, background,
+    fonts, colors, icon sizes and row positions.
+    """
+
+    @timed('CompactNotificationItem.__init__')
+    def __init__(self, time='', title='', duration=None, due=False, **kwargs):
+        super(CompactNotificationItem, self).__init__(**kwargs)
+        self.size_hint_y = None
+        self.height = dp(100)
+
+        with self.canvas:
+            # Shadow effect (slightly offset, darker rectangle behind)
+            Color(*SHADOW_COLOR)  # Light gray for shadow
+            self.shadow = RoundedRectangle(pos=(dp(2), -dp(2)), radius=[dp(10)])
+
+            # Main background (white rounded rectangle)
+            Color(*BACKGROUND_COLOR)
+            self.bg = RoundedRectangle(radius=[dp(10)])
+
+            # Texts
+            self.time_color = Color(*TIME_COLOR)
+            self.time_rect = Rectangle()
+            Color(*TITLE_COLOR)
+            self.title_rect = Rectangle()
+            Color(*DURATION_COLOR)
+            self.duration_rect = Rectangle()
+
+            # Icons (white tint, as drawn by kivy's Image)
+            self.duration_color = Color(1, 1, 1, 1)
+            self.clock_rect = Rectangle(texture=get_icon('clock'), size=(dp(16), dp(16)))
+            Color(1, 1, 1, 1)
+            self.bell_rect = Rectangle(texture=get_icon('notification'), size=(dp(24), dp(24)))
+
+        # Size the backgrounds, title and bell were last placed for
+        self._placed_size = None
+        self.bind(size=self._update_size)
+        self.set_content(time, title, duration, due)
+
+    def set_content(self, time, title, duration=None, due=False):
+        """Update the displayed notification."""
+        self.has_duration = bool(duration)
+        self.time_color.rgba = DUE_COLOR if due else TIME_COLOR
+        self.time_rect.texture = _text_texture(time, dp(16))
+        self.title_rect.texture = _text_texture(title, dp(16), bold=True)
+        self.duration_rect.texture = _text_texture(duration, dp(14)) if duration else None
+        self.duration_color.a = 1 if duration else 0
+        self._update_canvas()
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Show the notification at `index` in this (possibly reused) RecycleView row."""
+        self.set_content(
+                time=data.get('time', ''),
+                title=data.get('title', ''),
+                duration=data.get('duration', None),
+                due=data.get('due', False)
+        )
+
+    @staticmethod
+    def _place_text(rect, x, y, width, height):
+        """Center the text texture of `rect` in the given box, like a Label does."""
+        texture = rect.texture
+        if texture is None:
+            rect.size = (0, 0)
+            return
+        tw, th = texture.size
+        rect.size = (tw, th)
+        rect.pos = (int(x + (width - tw) / 2.), int(y + (height - th) / 2.))
+
+    def _update_canvas(self):
+        """Place the texts and icons for new content; same geometry as NotificationItem's box layouts.
+
+        Positions are relative to the item (see the Translate above), so moving it
+        changes none of them; what depends on its size is placed by _update_size.
+        """
+        padding_x, padding_y, spacing = dp(15), dp(10), dp(5)
+
+        # Rows are stacked from the bottom: bell, optional duration, then time and title
+        row_y = padding_y + dp(24) + spacing
+        if self.has_duration:
+            self.clock_rect.pos = (padding_x, row_y)
+            self._place_text(self.duration_rect, padding_x + dp(16), row_y, dp(100), dp(30))
+            row_y += dp(30) + spacing
+        else:
+            self.duration_rect.size = (0, 0)
+
+        self._place_text(self.time_rect, padding_x, row_y, dp(100), dp(40))
+
+        # The title is centered in the width the time leaves, so _update_size places it across
+        texture = self.title_rect.texture
+        self._title_size = texture.size if texture is not None else (0, 0)
+        self.title_rect.size = self._title_size
+        self._title_y = int(row_y + (dp(40) - self._title_size[1]) / 2.)
+        self._placed_size = None
+        self._update_size()
+
+    def _update_size(self, *args):
+        """Follow the item's size: only the backgrounds, the title and the bell depend on it."""
+        size = width, height = self.width, self.height
+        if size == self._placed_size:
+            # e.g. a recycled row given the size it already had
+            return
+        self._placed_size = size
+        padding_x, padding_y = dp(15), dp(10)
+
+        self.shadow.size = (width, height)
+        self.bg.size = (width, height)
+        self.title_rect.pos = (int(padding_x + dp(100) + (width - 2 * padding_x - dp(100) - self._title_size[0]) / 2.),
+                               self._title_y)
+        self.bell_rect.pos = (width - padding_x - dp(24), padding_y)
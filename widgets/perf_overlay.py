@@ -0,0 +1,33 @@
+from kivy.clock import Clock
+from kivy.metrics import dp
+from kivy.uix.label import Label
+from kivy.utils import get_color_from_hex
+
+from services import instrumentation
+
+
+class PerfOverlay(Label):
+    """Small FPS / jank readout drawn on top of the app (instrumentation builds only)."""
+
+    def __init__(self, interval=0.5, **kwargs):
+        super(PerfOverlay, self).__init__(
+                font_size=dp(12),
+                color=get_color_from_hex("#D0021B"),
+                size_hint=(None, None),
+                size=(dp(160), dp(20)),
+                **kwargs
+        )
+        self._refresh_event = Clock.schedule_interval(self._refresh, interval)
+
+    def _refresh(self, dt):
+        frames = instrumentation.get_frame_recorder()
+        jank = frames.jank if frames is not None else 0
+        self.text = f"{Clock.get_fps():.0f} fps  jank {jank}"
+
+        # Stay in the top right corner of the window
+        if self.parent is not None:
+            self.right = self.parent.width
+            self.top = self.parent.height
+
+    def stop(self):
+        self._refresh_event.cancel()
@@ -0,0 +1,125 @@
+"""Bounded LRU cache of rendered text textures, shared by every item.
+
+Times, durations and titles repeat across thousands of notifications, so each
+distinct (text, font, size, color, ...) combination is rendered once and the
+texture is shared. Least recently used textures are dropped past `capacity`;
+items still showing one keep it alive.
+
+Every texture is rendered by its own core label, which stays attached as the
+texture's reload observer, so shared textures come back after the GL context is
+lost (e.g. Android pause/resume).
+"""
+import time
+from collections import OrderedDict
+
+from kivy.core.text import Label as CoreLabel
+from kivy.uix.label import Label
+
+# Distinct texts kept; a feed has a few hundred distinct times, titles and durations
+DEFAULT_CAPACITY = 1024
+
+
+def _options_key(options):
+    """Return a hashable key for core label `options` (colors, padding and sizes come as lists).
+
+    Options are taken in the order given rather than sorted: a label always builds
+    them in the same order, and this runs for every texture a row shows.
+    """
+    return tuple((name, tuple(value) if isinstance(value, list) else value) for name, value in options.items())
+
+
+class TextTextureCache(object):
+    """Rendered text textures by text and label options, least recently used dropped first."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._textures = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Time spent rendering misses, in seconds
+        self.render_time = 0.
+
+    def __len__(self):
+        return len(self._textures)
+
+    def texture(self, text, **options):
+        """Return the texture of `text` rendered with core label `options`, or None for empty text."""
+        if not text:
+            return None
+        key = (text, _options_key(options))
+        texture = self._textures.get(key)
+        if texture is not None:
+            self.hits += 1
+            self._textures.move_to_end(key)
+            return texture
+
+        self.misses += 1
+        start = time.perf_counter()
+        label = CoreLabel(text=text, **options)
+        label.refresh()
+        texture = label.texture
+        self.render_time += time.perf_counter() - start
+
+        self._textures[key] = texture
+        if len(self._textures) > self.capacity:
+            self._textures.popitem(last=False)
+            self.evictions += 1
+        return texture
+
+    def stats(self):
+        """Return hit and render counters, and the render time the hits saved (estimated from the misses)."""
+        requests = self.hits + self.misses
+        render_each = self.render_time / self.misses if self.misses else 0.
+        return {
+                'requests': requests,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._textures),
+                'hit_rate': self.hits / requests if requests else 0.,
+                'render_ms': self.render_time * 1000,
+                'saved_ms': self.hits * render_each * 1000
+        }
+
+    def clear(self):
+        """Drop every texture and reset the counters."""
+        self._textures.clear()
+        self.hits = self.misses = self.evictions = 0
+        self.render_time = 0.
+
+
+# Cache shared by the whole app
+_cache = None
+
+
+def get_text_cache():
+    """Return the process-wide text texture cache."""
+    global _cache
+    if _cache is None:
+        _cache = TextTextureCache()
+    return _cache
+
+
+class CachedLabel(Label):
+    """Label whose texture comes from the shared text cache.
+
+    Plain labels only: markup and shortened labels render their own texture as usual.
+    """
+
+    def texture_update(self, *largs):
+        if self.markup or self.shorten:
+            super(CachedLabel, self).texture_update(*largs)
+            return
+        # The core label's options keep the text and size it was created with; the
+        # current ones are its text and text_size attributes
+        text = self._label.text
+        if (self.halign == 'justify' or self.strip) and not text.strip():
+            # As Label: text that strips to nothing shows nothing
+            text = ''
+        options = dict(self._label.options, text_size=self._label.text_size)
+        del options['text']
+        texture = get_text_cache().texture(text, **options)
+        self.texture = texture
+        self.texture_size = list(texture.size) if texture is not None else (0, 0)
+        self.is_shortened = False